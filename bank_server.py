@@ -1,11 +1,16 @@
+import collections
+import functools
 import grpc
 from concurrent import futures
-import json
+import itertools
 import logging
 import os
 import sys
+import threading
 import time
-import uuid 
+import uuid
+
+import orjson
 # Import the generated protocol buffer code
 import protofiles.payment_pb2 as payment_pb2
 import protofiles.payment_pb2_grpc as payment_pb2_grpc
@@ -13,41 +18,296 @@ import protofiles.payment_pb2_grpc as payment_pb2_grpc
 class BankServicer(payment_pb2_grpc.BankServiceServicer):
     """Implementation of the Bank service for authentication"""
     
+    # How long the snapshot thread waits after the first pending mutation so
+    # a burst of transactions is folded into a single snapshot write
+    SNAPSHOT_COALESCE_SECONDS = 0.05
+
+    # Upper bound on the in-memory cache of recent idempotent results
+    IDEM_CACHE_MAX = 50_000
+
+    # Prepared 2PC entries older than this are swept and dropped; a
+    # coordinator that vanished mid-transaction cannot pin funds forever
+    PREPARE_TTL_SECONDS = 60.0
+
     def __init__(self, bank_name):
         self.bank_name = bank_name
-        
+
+        # Snapshot file paths, computed once instead of re-built per save/load
+        base = f"data/{bank_name.lower()}"
+        self.users_path = base + "_users.json"
+        self.tx_path = base + "_transactions.json"
+        self.processed_path = base + "_processed_transactions.json"
+
         # Load user credentials from a JSON file
         self.users = self._load_user_credentials()
         self.transactions = self._load_transactions()
         self.processed_transactions = self._load_processed_transactions()
 
         self.prepared_transactions = {}
-        
+
+        # Bounded LRU of recently seen payment_ids so hot idempotent replays
+        # don't touch the (much larger) durable processed map
+        self.idem_cache = collections.OrderedDict()
+
+        # Per-account locks: transactions on different accounts commit in
+        # parallel while the same account serializes its read-modify-write
+        self.locks = collections.defaultdict(threading.Lock)
+        self._prepared_lock = threading.Lock()
+
+        # Mutations are appended to a write-ahead log instead of rewriting the
+        # full JSON snapshots on every transaction. A background thread
+        # periodically compacts the WAL back into the snapshot files.
+        self.wal_path = f"data/{bank_name.lower()}.wal"
+        self._replay_wal()
+        self.wal = open(self.wal_path, 'ab')
+        self._wal_lock = threading.Lock()
+        self._wal_records = 0
+        self._dirty = threading.Event()
+
+        # Last formatted timestamp, keyed by whole second; record_transaction
+        # only pays for strftime when the second actually changes
+        self._ts_cache = (0, "")
+
+        self._snapshot_thread = threading.Thread(target=self._snapshot_loop, daemon=True)
+        self._snapshot_thread.start()
+
+        self._prepare_sweeper = threading.Thread(target=self._prepare_ttl_loop, daemon=True)
+        self._prepare_sweeper.start()
+
         logging.info(f"Bank {bank_name} initialized with {len(self.users)} users")
 
+    @staticmethod
+    def _mk_resp(success, message, cls=payment_pb2.BankTransactionResponse):
+        """Build the response message and its idempotency-cache dict in one pass"""
+        response = cls(success=success, message=message)
+        return response, {"success": success, "message": message}
+
+    def _cache_idem(self, payment_id, response):
+        """Remember a processed response message in the bounded LRU cache"""
+        self.idem_cache[payment_id] = response
+        self.idem_cache.move_to_end(payment_id)
+        while len(self.idem_cache) > self.IDEM_CACHE_MAX:
+            self.idem_cache.popitem(last=False)
+
+    def _lookup_idem(self, payment_id, cls=payment_pb2.BankTransactionResponse):
+        """Return the cached response for a payment_id, or None if never seen
+
+        The cache holds ready-to-return response objects so a replay skips
+        protobuf construction entirely; entries evicted from the LRU are
+        hydrated lazily from the durable processed map. cls picks the
+        response type for hydration - a given payment_id only ever travels
+        through one RPC, so the cached object always matches.
+        """
+        response = self.idem_cache.get(payment_id)
+        if response is not None:
+            self.idem_cache.move_to_end(payment_id)
+            return response
+
+        result = self.processed_transactions.get(payment_id)
+        if result is not None:
+            response = cls(**result)
+            self._cache_idem(payment_id, response)
+        return response
+
+    def _append_wal(self, record):
+        """Durably append one mutation record to the write-ahead log"""
+        with self._wal_lock:
+            self.wal.write(orjson.dumps(record) + b"\n")
+            self.wal.flush()
+            os.fsync(self.wal.fileno())
+            self._wal_records += 1
+        self._dirty.set()
+
+    def _replay_wal(self):
+        """Apply any WAL records left over from a previous run onto the snapshots"""
+        if not os.path.exists(self.wal_path):
+            return
+
+        replayed = 0
+        with open(self.wal_path, 'rb') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    # Torn final write from a crash; ignore the partial record
+                    logging.warning(f"Skipping partial WAL record for {self.bank_name}")
+                    continue
+                self._apply_wal_record(record)
+                replayed += 1
+
+        if replayed:
+            logging.info(f"Replayed {replayed} WAL records for {self.bank_name}")
+            # Fold the replayed state into the snapshots and start a fresh WAL
+            self._save_user_credentials()
+            self._save_transactions()
+            self._save_processed_transactions()
+        with open(self.wal_path, 'w'):
+            pass
+
+    def _apply_wal_record(self, record):
+        """Apply a single WAL record to the in-memory state"""
+        record_type = record.get("type")
+
+        if record_type == "balance":
+            username = record["username"]
+            if username in self.users:
+                self.users[username]["balance"] = record["balance"]
+        elif record_type == "tx":
+            account_id = record["account_id"]
+            transaction = record["record"]
+            account_transactions = self.transactions.setdefault(account_id, collections.deque())
+            existing_ids = {t["transaction_id"] for t in account_transactions}
+            if transaction["transaction_id"] not in existing_ids:
+                account_transactions.append(transaction)
+        elif record_type == "processed":
+            self.processed_transactions[record["payment_id"]] = record["result"]
+        elif record_type == "apply":
+            # Combined record: balance change, history entry and idempotency
+            # result written as one atomic unit. The payment_id doubles as
+            # the dedup key on replay.
+            payment_id = record.get("payment_id")
+            if payment_id and payment_id in self.processed_transactions:
+                return
+            username = record["username"]
+            if username in self.users:
+                self.users[username]["balance"] = record["balance"]
+            transaction = record["tx"]
+            account_transactions = self.transactions.setdefault(record["account_id"], collections.deque())
+            existing_ids = {t["transaction_id"] for t in account_transactions}
+            if transaction["transaction_id"] not in existing_ids:
+                account_transactions.append(transaction)
+            if payment_id:
+                self.processed_transactions[payment_id] = record["result"]
+            done_tx_id = record.get("done_tx_id")
+            if done_tx_id:
+                self.prepared_transactions.pop(done_tx_id, None)
+        elif record_type == "transfer":
+            # Intra-bank 1PC transfer: two balances, two history entries and
+            # the idempotency result in one atomic unit
+            payment_id = record.get("payment_id")
+            if payment_id and payment_id in self.processed_transactions:
+                return
+            for username, balance in ((record["sender_username"], record["sender_balance"]),
+                                      (record["receiver_username"], record["receiver_balance"])):
+                if username in self.users:
+                    self.users[username]["balance"] = balance
+            for account_id, transaction in ((record["sender_account"], record["tx_debit"]),
+                                            (record["receiver_account"], record["tx_credit"])):
+                account_transactions = self.transactions.setdefault(account_id, collections.deque())
+                existing_ids = {t["transaction_id"] for t in account_transactions}
+                if transaction["transaction_id"] not in existing_ids:
+                    account_transactions.append(transaction)
+            if payment_id:
+                self.processed_transactions[payment_id] = record["result"]
+        elif record_type == "prepare":
+            self.prepared_transactions[record["tx_id"]] = record["entry"]
+        elif record_type == "prepare_done":
+            self.prepared_transactions.pop(record["tx_id"], None)
+
+    def _snapshot_loop(self):
+        """Compact the WAL into the JSON snapshot files when mutations arrive
+
+        Wakes on the first pending mutation, then waits a short coalescing
+        window so a burst of transactions amortizes into one snapshot write
+        with a single fsync per file.
+        """
+        while True:
+            self._dirty.wait()
+            time.sleep(self.SNAPSHOT_COALESCE_SECONDS)
+            self._dirty.clear()
+            if self._wal_records:
+                try:
+                    self._snapshot()
+                except Exception as e:
+                    logging.error(f"Error writing snapshot for {self.bank_name}: {str(e)}")
+
+    def _snapshot(self):
+        """Write all snapshot files and truncate the WAL
+
+        Prepared 2PC entries have no snapshot file of their own, so any still
+        outstanding are re-appended to the fresh WAL to stay durable.
+        """
+        with self._wal_lock:
+            self._save_user_credentials()
+            self._save_transactions()
+            self._save_processed_transactions()
+            os.truncate(self.wal.fileno(), 0)
+            self._wal_records = 0
+
+            with self._prepared_lock:
+                outstanding = list(self.prepared_transactions.items())
+            for tx_id, entry in outstanding:
+                self.wal.write(orjson.dumps({"type": "prepare", "tx_id": tx_id, "entry": entry}) + b"\n")
+                self._wal_records += 1
+            if outstanding:
+                self.wal.flush()
+                os.fsync(self.wal.fileno())
+
+    def _prepare_ttl_loop(self):
+        """Drop prepared transactions whose coordinator never came back"""
+        while True:
+            time.sleep(self.PREPARE_TTL_SECONDS / 4)
+            cutoff = time.time() - self.PREPARE_TTL_SECONDS
+            with self._prepared_lock:
+                stale = [
+                    tx_id for tx_id, entry in self.prepared_transactions.items()
+                    if entry["details"]["timestamp"] < cutoff
+                ]
+                for tx_id in stale:
+                    del self.prepared_transactions[tx_id]
+            for tx_id in stale:
+                self._append_wal({"type": "prepare_done", "tx_id": tx_id})
+                logging.warning(f"Prepared transaction {tx_id} expired after "
+                                f"{self.PREPARE_TTL_SECONDS}s and was aborted")
+
         
 
     def _load_processed_transactions(self):
         """Load record of processed transactions"""
-        file_path = f"data/{self.bank_name.lower()}_processed_transactions.json"
-        
+        file_path = self.processed_path
+
         if not os.path.exists(file_path):
             # Initialize empty set of processed transactions
-            with open(file_path, 'w') as f:
-                json.dump({}, f)
+            with open(file_path, 'wb') as f:
+                f.write(orjson.dumps({}))
             
             return {}
         
         # Load from file
-        with open(file_path, 'r') as f:
-            return json.load(f)
+        with open(file_path, 'rb') as f:
+            return orjson.loads(f.read())
         
     def _save_processed_transactions(self):
         """Save processed transactions to a file"""
-        file_path = f"data/{self.bank_name.lower()}_processed_transactions.json"
-        
-        with open(file_path, 'w') as f:
-            json.dump(self.processed_transactions, f, indent=2)
+        self._atomic_write_json(self.processed_path, self.processed_transactions)
+
+    @staticmethod
+    def _atomic_write_json(path, obj):
+        """Write a JSON snapshot crash-safely: temp file, fsync, then rename
+
+        The payload is serialized to one bytes object and written with a
+        single os.write, so the whole snapshot is one syscall instead of the
+        many small buffered writes json.dump would issue.
+        """
+        payload = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+        tmp_path = path + ".tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, payload)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+
+        # fsync the directory so the rename itself survives a crash
+        dir_fd = os.open(os.path.dirname(path) or ".", os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
 
     def ProcessTransaction(self, request, context):
         """Process a debit or credit transaction with idempotency support"""
@@ -61,91 +321,88 @@ class BankServicer(payment_pb2_grpc.BankServiceServicer):
         logging.info(f"Transaction request: account={account_id}, type={transaction_type}, amount={amount}")
         
         # Idempotency check - if we've processed this transaction before, return the cached result
-        if payment_id and payment_id in self.processed_transactions:
-            logging.info(f"Returning cached result for idempotent transaction: {payment_id}")
-            return payment_pb2.BankTransactionResponse(**self.processed_transactions[payment_id])
-        
-        # Validate account
-        account_exists = False
-        for username, user_data in self.users.items():
-            if user_data["account_id"] == account_id:
-                account_exists = True
-                
+        if payment_id:
+            cached = self._lookup_idem(payment_id)
+            if cached is not None:
+                logging.info(f"Returning cached result for idempotent transaction: {payment_id}")
+                return cached
+        
+        # Validate account with the O(1) index
+        username = self.accounts_by_id.get(account_id)
+        if username is not None:
+            # Serialize on this account only; other accounts proceed in parallel
+            with self.locks[account_id]:
+                user_data = self.users[username]
+                transaction = None
+
                 # Process transaction
                 if transaction_type == "debit":
                     # Check if account has sufficient funds
                     if user_data["balance"] < amount:
-                        response = payment_pb2.BankTransactionResponse(
-                            success=False,
-                            message=f"Insufficient funds. Current balance: {user_data['balance']}"
-                        )
+                        response, cache_entry = self._mk_resp(
+                            False, f"Insufficient funds. Current balance: {user_data['balance']}")
                     else:
                         # Deduct amount from account
                         user_data["balance"] -= amount
 
-                        self._save_user_credentials()
-                        
                         # Record transaction
-                        self.record_transaction(account_id, "debit", amount, counterparty)
-                        
-                        response = payment_pb2.BankTransactionResponse(
-                            success=True,
-                            message=f"Debit successful. New balance: {user_data['balance']}"
-                        )
+                        transaction = self.record_transaction(
+                            account_id, "debit", amount, counterparty, durable=False)
+
+                        response, cache_entry = self._mk_resp(
+                            True, f"Debit successful. New balance: {user_data['balance']}")
                 elif transaction_type == "credit":
                     # Add amount to account
                     user_data["balance"] += amount
 
-
-                    self._save_user_credentials()
-                    
                     # Record transaction
-                    self.record_transaction(account_id, "credit", amount, counterparty)
-                    
-                    response = payment_pb2.BankTransactionResponse(
-                        success=True,
-                        message=f"Credit successful. New balance: {user_data['balance']}"
-                    )
+                    transaction = self.record_transaction(
+                        account_id, "credit", amount, counterparty, durable=False)
+
+                    response, cache_entry = self._mk_resp(
+                        True, f"Credit successful. New balance: {user_data['balance']}")
                 else:
-                    response = payment_pb2.BankTransactionResponse(
-                        success=False,
-                        message=f"Invalid transaction type: {transaction_type}"
-                    )
-                
+                    response, cache_entry = self._mk_resp(
+                        False, f"Invalid transaction type: {transaction_type}")
+
                 # Cache the result for idempotency
                 if payment_id:
-                    self.processed_transactions[payment_id] = {
-                        "success": response.success,
-                        "message": response.message
-                    }
-                    self._save_processed_transactions()
-                
+                    self.processed_transactions[payment_id] = cache_entry
+                    self._cache_idem(payment_id, response)
+
+                if transaction is not None:
+                    # Balance change, history entry and idempotency result go
+                    # into one WAL record with a single fsync, so no crash
+                    # window can double-apply the payment on retry
+                    self._append_wal({"type": "apply", "payment_id": payment_id,
+                                      "username": username, "balance": user_data["balance"],
+                                      "account_id": account_id, "tx": transaction,
+                                      "result": cache_entry if payment_id else None})
+                elif payment_id:
+                    self._append_wal({"type": "processed", "payment_id": payment_id,
+                                      "result": cache_entry})
+
                 return response
-        
+
         # If account not found
         context.set_code(grpc.StatusCode.NOT_FOUND)
         context.set_details(f"Account {account_id} not found in bank {self.bank_name}")
         
-        response = payment_pb2.BankTransactionResponse(
-            success=False,
-            message=f"Account {account_id} not found"
-        )
-        
+        response, cache_entry = self._mk_resp(False, f"Account {account_id} not found")
+
         # Cache the result for idempotency
         if payment_id:
-            self.processed_transactions[payment_id] = {
-                "success": response.success,
-                "message": response.message
-            }
-            self._save_processed_transactions()
-        
+            self.processed_transactions[payment_id] = cache_entry
+            self._cache_idem(payment_id, response)
+            self._append_wal({"type": "processed", "payment_id": payment_id,
+                              "result": cache_entry})
+
         return response
     
     def _load_user_credentials(self):
         """Load user credentials from a file"""
-        # File path based on bank name
-        file_path = f"data/{self.bank_name.lower()}_users.json"
-        
+        file_path = self.users_path
+
         # Check if directory exists, if not create it
         os.makedirs("data", exist_ok=True)
         
@@ -162,14 +419,21 @@ class BankServicer(payment_pb2_grpc.BankServiceServicer):
             }
             
             # Save to file
-            with open(file_path, 'w') as f:
-                json.dump(sample_users, f, indent=2)
+            with open(file_path, 'wb') as f:
+                f.write(orjson.dumps(sample_users, option=orjson.OPT_INDENT_2))
             
             logging.info(f"Created sample user data for {self.bank_name}")
         
         # Load users from file
-        with open(file_path, 'r') as f:
-            return json.load(f)
+        with open(file_path, 'rb') as f:
+            users = orjson.loads(f.read())
+
+        # Secondary index so account lookups are O(1) instead of scanning all users
+        self.accounts_by_id = {
+            user_data["account_id"]: username for username, user_data in users.items()
+        }
+
+        return users
     
     def VerifyCredentials(self, request, context):
         """Verify user credentials"""
@@ -206,14 +470,14 @@ class BankServicer(payment_pb2_grpc.BankServiceServicer):
         logging.info(f"Balance check for account {account_id}")
         
         # Check if account exists in this bank
-        for username, user_data in self.users.items():
-            if user_data["account_id"] == account_id:
-                return payment_pb2.BankBalanceResponse(
-                    success=True,
-                    balance=user_data["balance"],
-                    message="Balance retrieved successfully"
-                )
-        
+        username = self.accounts_by_id.get(account_id)
+        if username is not None:
+            return payment_pb2.BankBalanceResponse(
+                success=True,
+                balance=self.users[username]["balance"],
+                message="Balance retrieved successfully"
+            )
+
         # If account not found
         context.set_code(grpc.StatusCode.NOT_FOUND)
         context.set_details(f"Account {account_id} not found in bank {self.bank_name}")
@@ -224,8 +488,8 @@ class BankServicer(payment_pb2_grpc.BankServiceServicer):
         )
     def _load_transactions(self):
         """Load transaction history from a file or initialize if it doesn't exist"""
-        file_path = f"data/{self.bank_name.lower()}_transactions.json"
-        
+        file_path = self.tx_path
+
         if not os.path.exists(file_path):
             # Initialize with empty transaction history for each account
             transactions = {}
@@ -242,91 +506,93 @@ class BankServicer(payment_pb2_grpc.BankServiceServicer):
                     "amount": user_data["balance"],
                     "counterparty": "Bank",
                     "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                    "ts_ms": int(time.time() * 1000),
                     "status": "completed"
                 }
                 transactions[account_id].append(initial_deposit)
             
             # Save to file
-            with open(file_path, 'w') as f:
-                json.dump(transactions, f, indent=2)
+            with open(file_path, 'wb') as f:
+                f.write(orjson.dumps(transactions, option=orjson.OPT_INDENT_2))
             
             logging.info(f"Initialized transaction history for {self.bank_name}")
-            return transactions
-        
-        # Load transactions from file
-        with open(file_path, 'r') as f:
-            return json.load(f)
+            return {account_id: collections.deque(tx_list) for account_id, tx_list in transactions.items()}
+        
+        # Load transactions from file. Each account's history is kept as a
+        # deque in insertion (chronological) order so recent-first reads are
+        # a slice off the tail instead of a sort.
+        with open(file_path, 'rb') as f:
+            loaded = orjson.loads(f.read())
+        return {account_id: collections.deque(tx_list) for account_id, tx_list in loaded.items()}
     
     def _save_transactions(self):
         """Save transaction history to a file"""
-        file_path = f"data/{self.bank_name.lower()}_transactions.json"
-        
-        with open(file_path, 'w') as f:
-            json.dump(self.transactions, f, indent=2)
-    def record_transaction(self, account_id, transaction_type, amount, counterparty, status="completed", transaction_id = None):
-        """Record a new transaction in the history"""
+        # deques are not JSON-serializable directly
+        snapshot = {account_id: list(tx_list) for account_id, tx_list in self.transactions.items()}
+        self._atomic_write_json(self.tx_path, snapshot)
+    def record_transaction(self, account_id, transaction_type, amount, counterparty, status="completed", transaction_id = None, durable=True):
+        """Record a new transaction in the history
+
+        With durable=False the entry is only added in memory and returned,
+        so the caller can fold it into a larger combined WAL record.
+        """
         if not hasattr(self, 'transactions'):
             self.transactions = self._load_transactions()
 
         if account_id not in self.transactions:
-            self.transactions[account_id] = []
-        
+            self.transactions[account_id] = collections.deque()
+
+        now = time.time()
+        now_s = int(now)
+        if now_s != self._ts_cache[0]:
+            self._ts_cache = (now_s, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now_s)))
+
         transaction = {
             "transaction_id": transaction_id if transaction_id else str(uuid.uuid4()),
             "type": transaction_type,
             "amount": amount,
             "counterparty": counterparty,
-            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "timestamp": self._ts_cache[1],
+            "ts_ms": int(now * 1000),
             "status": status
         }
         
         self.transactions[account_id].append(transaction)
-        self._save_transactions()
-        
+        if durable:
+            self._append_wal({"type": "tx", "account_id": account_id, "record": transaction})
+
         return transaction
     def GetTransactionHistory(self, request, context):
-        """Get transaction history for an account"""
+        """Stream transaction history for an account, newest first
+
+        Server-streaming keeps peak memory at one Transaction instead of
+        materializing the whole history into a single bulk response.
+        """
         account_id = request.account_id
         limit = request.limit
-        
+
         # Log the history request
         logging.info(f"Transaction history request for account {account_id}, limit {limit}")
-        
-        # Check if account exists in this bank
-        account_exists = False
-        for username, user_data in self.users.items():
-            if user_data["account_id"] == account_id:
-                account_exists = True
-                break
-        
-        if not account_exists:
+
+        # Check if account exists in this bank - O(1) against the index
+        if account_id not in self.accounts_by_id:
             context.set_code(grpc.StatusCode.NOT_FOUND)
             context.set_details(f"Account {account_id} not found in bank {self.bank_name}")
-            return payment_pb2.BankHistoryResponse(
-                success=False,
-                message=f"Account {account_id} not found"
-            )
-        
+            return
+
         # Get transactions for the account
-        if account_id not in self.transactions:
-            # No transactions found
-            return payment_pb2.BankHistoryResponse(
-                success=True,
-                message="No transactions found for this account"
-            )
-        
-        # Get the most recent transactions up to the limit
-        account_transactions = self.transactions[account_id]
-        recent_transactions = sorted(
-            account_transactions, 
-            key=lambda t: t["timestamp"], 
-            reverse=True
-        )[:limit]
-        
-        # Convert to protobuf Transaction objects
-        pb_transactions = []
+        account_transactions = self.transactions.get(account_id)
+        if not account_transactions:
+            # No transactions found; an empty stream says so
+            return
+
+        # Transactions are appended in time order, so the newest `limit`
+        # entries are simply the tail of the deque read backwards - no sort.
+        # Snapshot the slice first so writers can keep appending while we stream.
+        recent_transactions = list(itertools.islice(reversed(account_transactions), limit))
+
         for tx in recent_transactions:
-            pb_tx = payment_pb2.Transaction(
+            yield payment_pb2.Transaction(
                 transaction_id=tx["transaction_id"],
                 type=tx["type"],
                 amount=float(tx["amount"]),
@@ -334,21 +600,104 @@ class BankServicer(payment_pb2_grpc.BankServiceServicer):
                 timestamp=tx["timestamp"],
                 status=tx["status"]
             )
-            pb_transactions.append(pb_tx)
-        
-        return payment_pb2.BankHistoryResponse(
-            success=True,
-            transactions=pb_transactions,
-            message=f"Retrieved {len(pb_transactions)} transactions"
-        )
 
     def _save_user_credentials(self):
         """Save user credentials to the file"""
-        file_path = f"data/{self.bank_name.lower()}_users.json"
-        with open(file_path, 'w') as f:
-            json.dump(self.users, f, indent=2)
+        self._atomic_write_json(self.users_path, self.users)
         logging.info(f"User data saved for {self.bank_name}")
 
+    def ExecuteTransfer(self, request, context):
+        """Execute an intra-bank transfer as a single local transaction (1PC)
+
+        When sender and receiver live in the same bank, 2PC degenerates to
+        one atomic local update, so the gateway sends this single call
+        instead of two prepares and two commits. Debit, credit, both
+        history entries and the idempotency result are applied under both
+        account locks and persisted as one WAL record.
+        """
+        sender_account = request.sender_account
+        receiver_account = request.receiver_account
+        amount = request.amount
+        transaction_id = request.transaction_id
+        payment_id = request.payment_id
+
+        logging.info(f"Transfer request: {sender_account} -> {receiver_account}, amount={amount}")
+
+        # Idempotency check - a retried transfer returns the original result
+        if payment_id:
+            cached = self._lookup_idem(payment_id, payment_pb2.ExecuteTransferResponse)
+            if cached is not None:
+                logging.info(f"Returning cached result for idempotent transfer: {payment_id}")
+                return cached
+
+        sender_username = self.accounts_by_id.get(sender_account)
+        receiver_username = self.accounts_by_id.get(receiver_account)
+
+        if sender_username is None or receiver_username is None:
+            missing = sender_account if sender_username is None else receiver_account
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            context.set_details(f"Account {missing} not found in bank {self.bank_name}")
+
+            response, cache_entry = self._mk_resp(
+                False, f"Account {missing} not found", payment_pb2.ExecuteTransferResponse)
+            if payment_id:
+                self.processed_transactions[payment_id] = cache_entry
+                self._cache_idem(payment_id, response)
+                self._append_wal({"type": "processed", "payment_id": payment_id,
+                                  "result": cache_entry})
+            return response
+
+        # Take both account locks in sorted order so two opposite transfers
+        # between the same pair can never deadlock
+        first, second = sorted((sender_account, receiver_account))
+        with self.locks[first], self.locks[second]:
+            sender_data = self.users[sender_username]
+            debit_tx = credit_tx = None
+
+            if sender_data["balance"] < amount:
+                response, cache_entry = self._mk_resp(
+                    False, f"Insufficient funds. Current balance: {sender_data['balance']}",
+                    payment_pb2.ExecuteTransferResponse)
+            else:
+                sender_data["balance"] -= amount
+                self.users[receiver_username]["balance"] += amount
+
+                debit_tx = self.record_transaction(
+                    sender_account, "debit", amount,
+                    f"{self.bank_name}/{receiver_account}",
+                    transaction_id=f"{transaction_id}-debit", durable=False)
+                credit_tx = self.record_transaction(
+                    receiver_account, "credit", amount,
+                    f"{self.bank_name}/{sender_account}",
+                    transaction_id=f"{transaction_id}-credit", durable=False)
+
+                response, cache_entry = self._mk_resp(
+                    True, "Transfer completed successfully",
+                    payment_pb2.ExecuteTransferResponse)
+
+            # Cache the result for idempotency
+            if payment_id:
+                self.processed_transactions[payment_id] = cache_entry
+                self._cache_idem(payment_id, response)
+
+            if debit_tx is not None:
+                # Both balances, both history entries and the idempotency
+                # result go into one WAL record with a single fsync
+                self._append_wal({"type": "transfer", "payment_id": payment_id,
+                                  "sender_username": sender_username,
+                                  "sender_balance": sender_data["balance"],
+                                  "receiver_username": receiver_username,
+                                  "receiver_balance": self.users[receiver_username]["balance"],
+                                  "sender_account": sender_account,
+                                  "receiver_account": receiver_account,
+                                  "tx_debit": debit_tx, "tx_credit": credit_tx,
+                                  "result": cache_entry if payment_id else None})
+            elif payment_id:
+                self._append_wal({"type": "processed", "payment_id": payment_id,
+                                  "result": cache_entry})
+
+            return response
+
     def PrepareTransaction(self, request, context):
         transaction_id = request.transaction_id
         account_id = request.account_id
@@ -358,23 +707,18 @@ class BankServicer(payment_pb2_grpc.BankServiceServicer):
 
         logging.info(f"Prepare transaction request: id={transaction_id}, account={account_id}, type={transaction_type}, amount={amount}")
 
-        if transaction_id in self.prepared_transactions:
+        with self._prepared_lock:
+            prepared = self.prepared_transactions.get(transaction_id)
+        if prepared is not None:
             logging.info(f"Transaction already prepared: {transaction_id}")
             return payment_pb2.PrepareTransactionResponse(
-                ready=self.prepared_transactions[transaction_id]["ready"],
-                message=self.prepared_transactions[transaction_id]["message"]
+                ready=prepared["ready"],
+                message=prepared["message"]
             )
 
-        account_exists = False
-        account_username = None
-
-        for username, user_data in self.users.items():
-            if user_data["account_id"] == account_id:
-                account_exists = True
-                account_username = username
-                break
+        account_username = self.accounts_by_id.get(account_id)
 
-        if not account_exists:
+        if account_username is None:
             logging.warning(f"Account {account_id} not found for prepare transaction")
             return payment_pb2.PrepareTransactionResponse(
                 ready=False,
@@ -391,7 +735,7 @@ class BankServicer(payment_pb2_grpc.BankServiceServicer):
                 )
 
         # Store the prepared transaction information
-        self.prepared_transactions[transaction_id] = {
+        prepared_entry = {
             "ready": True,
             "message": "Ready to process transaction",
             "details": {
@@ -403,6 +747,12 @@ class BankServicer(payment_pb2_grpc.BankServiceServicer):
                 "timestamp": time.time()
             }
         }
+        with self._prepared_lock:
+            self.prepared_transactions[transaction_id] = prepared_entry
+
+        # Persist the prepare vote so a crash between Prepare and Commit
+        # doesn't silently drop the 2PC state
+        self._append_wal({"type": "prepare", "tx_id": transaction_id, "entry": prepared_entry})
 
         logging.info(f"Transaction {transaction_id} prepared successfully")
         return payment_pb2.PrepareTransactionResponse(
@@ -417,16 +767,16 @@ class BankServicer(payment_pb2_grpc.BankServiceServicer):
         logging.info(f"Commit transaction request: id={transaction_id}")
         
         # Check if this transaction was prepared
-        if transaction_id not in self.prepared_transactions:
+        with self._prepared_lock:
+            tx_info = self.prepared_transactions.get(transaction_id)
+
+        if tx_info is None:
             logging.warning(f"Cannot commit unprepared transaction: {transaction_id}")
             return payment_pb2.CommitTransactionResponse(
                 success=False,
                 message="Transaction not prepared"
             )
-        
-        # Get the prepared transaction details
-        tx_info = self.prepared_transactions[transaction_id]
-        
+
         if not tx_info["ready"]:
             logging.warning(f"Cannot commit transaction that was not ready: {transaction_id}")
             return payment_pb2.CommitTransactionResponse(
@@ -443,27 +793,34 @@ class BankServicer(payment_pb2_grpc.BankServiceServicer):
         
         # Process the transaction
         try:
-            # Update balance
-            if transaction_type == "debit":
-                self.users[username]["balance"] -= amount
-            elif transaction_type == "credit":
-                self.users[username]["balance"] += amount
-            
-            # Save changes
-            self._save_user_credentials()
-            
-            # Record in transaction history
-            self.record_transaction(
-                account_id, 
-                transaction_type, 
-                amount, 
-                counterparty, 
-                transaction_id=transaction_id
-            )
-            
+            with self.locks[account_id]:
+                # Update balance
+                if transaction_type == "debit":
+                    self.users[username]["balance"] -= amount
+                elif transaction_type == "credit":
+                    self.users[username]["balance"] += amount
+
+                # Record in transaction history
+                transaction = self.record_transaction(
+                    account_id,
+                    transaction_type,
+                    amount,
+                    counterparty,
+                    transaction_id=transaction_id,
+                    durable=False
+                )
+
             # Remove from prepared transactions
-            del self.prepared_transactions[transaction_id]
-            
+            with self._prepared_lock:
+                self.prepared_transactions.pop(transaction_id, None)
+
+            # Balance change, history entry and prepared-state removal are
+            # one atomic WAL record with a single fsync
+            self._append_wal({"type": "apply", "username": username,
+                              "balance": self.users[username]["balance"],
+                              "account_id": account_id, "tx": transaction,
+                              "done_tx_id": transaction_id})
+
             logging.info(f"Transaction {transaction_id} committed successfully")
             return payment_pb2.CommitTransactionResponse(
                 success=True,
@@ -484,16 +841,18 @@ class BankServicer(payment_pb2_grpc.BankServiceServicer):
         logging.info(f"Abort transaction request: id={transaction_id}")
         
         # Check if this transaction was prepared
-        if transaction_id not in self.prepared_transactions:
+        with self._prepared_lock:
+            removed = self.prepared_transactions.pop(transaction_id, None)
+
+        if removed is None:
             logging.info(f"Transaction not found to abort: {transaction_id}")
             return payment_pb2.AbortTransactionResponse(
                 success=True,
                 message="Transaction not found, considered aborted"
             )
-        
-        # Remove from prepared transactions
-        del self.prepared_transactions[transaction_id]
-        
+
+        self._append_wal({"type": "prepare_done", "tx_id": transaction_id})
+
         logging.info(f"Transaction {transaction_id} aborted successfully")
         return payment_pb2.AbortTransactionResponse(
             success=True,
@@ -503,33 +862,52 @@ class BankServicer(payment_pb2_grpc.BankServiceServicer):
 
                                                 
 
-def serve(bank_name, port):
-    """Start the bank server with SSL/TLS enabled"""
-    # Set up logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format=f'%(asctime)s - {bank_name} - %(levelname)s - %(message)s'
-    )
-    
+@functools.lru_cache(maxsize=1)
+def _server_credentials():
+    """Read the PEM material and build the server credentials once
+
+    Cached at module scope so repeated serve() calls (tests, supervised
+    restarts in the same process) skip the file reads and PEM parsing.
+    """
     # Load server key and certificate
     with open('certificate/server.key', 'rb') as f:
         server_key = f.read()
     with open('certificate/server.cert', 'rb') as f:
         server_cert = f.read()
-    
+
     # Load CA certificate for client validation (for mutual TLS)
     with open('certificate/ca.cert', 'rb') as f:
         ca_cert = f.read()
-    
-    # Create SSL credentials
-    server_credentials = grpc.ssl_server_credentials(
+
+    return grpc.ssl_server_credentials(
         [(server_key, server_cert)],
         root_certificates=ca_cert,
         require_client_auth=True  # Enable mutual TLS
     )
-    
-    # Create gRPC server
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+
+
+def serve(bank_name, port):
+    """Start the bank server with SSL/TLS enabled"""
+    # Set up logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format=f'%(asctime)s - {bank_name} - %(levelname)s - %(message)s'
+    )
+
+    server_credentials = _server_credentials()
+
+    # Create gRPC server. Handlers are short and I/O goes through the WAL,
+    # so concurrency is bounded by the pool size rather than a fixed cap.
+    workers = int(os.environ.get("BANK_GRPC_WORKERS", (os.cpu_count() or 1) * 2))
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bank-rpc"),
+        options=[
+            ("grpc.so_reuseport", 1),
+            ("grpc.keepalive_time_ms", 30000),
+            ("grpc.max_concurrent_streams", 1000),
+        ],
+        compression=grpc.Compression.Gzip,
+    )
     
     # Add our service to the server
     payment_pb2_grpc.add_BankServiceServicer_to_server(
@@ -1,19 +1,238 @@
+import functools
 import grpc
+import itertools
 import logging
 import uuid
 import hashlib
-import json
+import mmap
 import os
+import queue
+import struct
 import sys
 from collections import deque
 import time
 import threading
+from concurrent import futures
 
+import orjson
 import protofiles.payment_pb2 as payment_pb2
 import protofiles.payment_pb2_grpc as payment_pb2_grpc
 
+
+@functools.lru_cache(maxsize=1)
+def _channel_credentials():
+    """Read the client TLS material and build channel credentials once
+
+    Reconnect storms used to re-read all three PEM files on every
+    connect(); the cache makes reconnects filesystem-free. Call
+    _channel_credentials.cache_clear() if certificates are rotated.
+    """
+    with open('certificate/client.key', 'rb') as f:
+        client_key = f.read()
+    with open('certificate/client.cert', 'rb') as f:
+        client_cert = f.read()
+
+    # CA certificate for server validation
+    with open('certificate/ca.cert', 'rb') as f:
+        ca_cert = f.read()
+
+    return grpc.ssl_channel_credentials(
+        root_certificates=ca_cert,
+        private_key=client_key,
+        certificate_chain=client_cert
+    )
+
+
+class PendingWAL:
+    """Append-only log backing the client's pending-payment queue
+
+    One payment used to mean one JSON file created on enqueue and unlinked on
+    completion - two syscall round-trips plus directory metadata updates per
+    payment. The log replaces both with a single fixed-width append:
+    completions are tombstone records, and the file is compacted once
+    tombstones outweigh live entries. Records are struct-packed to a fixed
+    layout, so scans are a straight iter_unpack with no per-record parsing
+    and a torn tail write from a crash is just a trailing partial record.
+    """
+
+    # op (OP_ADD/OP_DEL), payment_id, receiver_account, receiver_bank,
+    # amount, enqueue timestamp. String fields are UTF-8 null-padded to
+    # their width: 36 covers a uuid4 string, 32 covers account/bank names.
+    _REC = struct.Struct('<B36s32s32sdd')
+    _OP_ADD = 0
+    _OP_DEL = 1
+
+    # Upper bound on how many queued records share one fsync
+    COMMIT_MAX_BATCH = 64
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, "wal.log")
+        self._lock = threading.Lock()
+        self._wal = open(self.path, 'ab')
+
+        # A crash mid-append leaves a partial record at the tail; drop it
+        # now so new appends stay aligned to the record size
+        size = self._wal.tell()
+        torn = size % self._REC.size
+        if torn:
+            self._wal.truncate(size - torn)
+
+        # Group commit: a dedicated worker drains queued records and flushes
+        # them under a single fsync, so a burst of N appends costs one device
+        # flush instead of N. Callers still block until their record is on
+        # disk, so durability semantics are unchanged.
+        self._commit_q = queue.SimpleQueue()
+        self._commit_thread = threading.Thread(target=self._commit_loop, daemon=True)
+        self._commit_thread.start()
+        # Cached read-only mapping of the log; scans reuse it across retry
+        # cycles and only remap when the file has grown or been compacted
+        self._mm = None
+
+    def _pack(self, op, payment_id, transaction=None):
+        return self._REC.pack(
+            op,
+            payment_id.encode(),
+            transaction["receiver_account"].encode() if transaction else b"",
+            transaction["receiver_bank"].encode() if transaction else b"",
+            transaction["amount"] if transaction else 0.0,
+            transaction["timestamp"] if transaction else 0.0
+        )
+
+    def _append(self, record):
+        """Hand a record to the commit worker and wait until it is durable"""
+        done = threading.Event()
+        self._commit_q.put((record, done))
+        done.wait()
+
+    def _commit_loop(self):
+        """Write queued records in batches with one fsync per batch"""
+        while True:
+            item = self._commit_q.get()
+            if item is None:
+                return
+            batch = [item]
+
+            # Fold in whatever else arrived while the last flush was running
+            while len(batch) < self.COMMIT_MAX_BATCH:
+                try:
+                    item = self._commit_q.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._commit_q.put(None)
+                    break
+                batch.append(item)
+
+            with self._lock:
+                # Coalesce the batch into one buffer so the flush issues a
+                # single write syscall for the whole group
+                self._wal.write(b"".join(record for record, _ in batch))
+                self._wal.flush()
+                os.fsync(self._wal.fileno())
+
+            for _, done in batch:
+                done.set()
+
+    def append(self, payment_id, transaction):
+        """Durably enqueue one pending payment"""
+        self._append(self._pack(self._OP_ADD, payment_id, transaction))
+
+    def tombstone(self, payment_id):
+        """Mark a pending payment as completed"""
+        self._append(self._pack(self._OP_DEL, payment_id))
+
+    def _mapped(self):
+        """Return a read-only mapping of the log, remapping only when it changed
+
+        mmap lets record scans read straight out of the page cache with no
+        read() syscalls or userspace copies; retry bursts become CPU-bound on
+        decoding instead of syscall-bound.
+        """
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            size = 0
+        if size == 0:
+            return b""
+
+        if self._mm is None or len(self._mm) != size:
+            if self._mm is not None:
+                self._mm.close()
+            with open(self.path, 'rb') as f:
+                self._mm = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+        return self._mm
+
+    def _scan(self):
+        """Yield every decoded record in log order, dropping any torn tail"""
+        data = self._mapped()
+
+        # A crash mid-append leaves a partial trailing record; ignore it
+        usable = len(data) - (len(data) % self._REC.size)
+        for op, payment_id, account, bank, amount, timestamp in self._REC.iter_unpack(memoryview(data)[:usable]):
+            yield op, payment_id.rstrip(b'\0').decode(), {
+                "receiver_account": account.rstrip(b'\0').decode(),
+                "receiver_bank": bank.rstrip(b'\0').decode(),
+                "amount": amount,
+                "timestamp": timestamp
+            }
+
+    def live(self):
+        """Return the payment_id -> transaction map of uncompleted payments
+
+        Compacts the log in passing when tombstones outnumber live records,
+        so the file stays proportional to the actual backlog.
+        """
+        live = {}
+        tombstones = 0
+        for op, payment_id, transaction in self._scan():
+            if op == self._OP_ADD:
+                live[payment_id] = transaction
+            else:
+                tombstones += 1
+                live.pop(payment_id, None)
+
+        if tombstones > len(live):
+            self._compact(live)
+        return live
+
+    def _compact(self, live):
+        """Rewrite the log with only live records, then swap it in atomically"""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            for payment_id, transaction in live.items():
+                f.write(self._pack(self._OP_ADD, payment_id, transaction))
+            f.flush()
+            os.fsync(f.fileno())
+
+        with self._lock:
+            self._wal.close()
+            os.replace(tmp_path, self.path)
+            self._wal = open(self.path, 'ab')
+            if self._mm is not None:
+                # The mapping points at the replaced inode
+                self._mm.close()
+                self._mm = None
+
+    def close(self):
+        self._commit_q.put(None)
+        self._commit_thread.join(timeout=1.0)
+        with self._lock:
+            self._wal.close()
+            if self._mm is not None:
+                self._mm.close()
+                self._mm = None
+
+
 class PaymentClient:
-    
+
+    # Number of parallel channels to the gateway; each gets its own TCP/TLS
+    # connection and HTTP/2 flow-control window
+    CHANNEL_POOL_SIZE = 4
+
+    # Cap on concurrently in-flight payment retries
+    RETRY_MAX_IN_FLIGHT = 64
+
     def __init__(self):
         # Set up logging
         logging.basicConfig(
@@ -27,81 +246,88 @@ class PaymentClient:
         self.token = None
         self.is_connected = False
 
-        self.stop_monitoring = False
-        self.connectivity_thread = None
+        # Pool of channels; payments round-robin across their stubs so
+        # concurrent sends aren't serialized on one HTTP/2 connection
+        self._channel_pool = []
+        self._stubs = []
+        self._stub_cycle = None
+
+        # Pending retries run off the channel-state callback; a single
+        # worker keeps them serialized and off the gRPC callback thread
+        self._retry_executor = futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="retry")
 
         self.client_id = str(uuid.uuid4())
+
+        # Payment ids are derived by hashing client_id + counter + clock
+        # instead of drawing kernel entropy per payment
+        self._pay_counter = itertools.count()
+
         self.pending_dir = f"pending_transactions/{self.client_id}"
-        os.makedirs(self.pending_dir, exist_ok=True)
 
-    def start_connectivity_monitor(self, check_interval = 10):
-        if self.connectivity_thread and self.connectivity_thread.is_alive():
-            #logging.info("Connectivity monitor running...")
-            return
-        
-        self.stop_monitoring = False    
-        self.connectivity_thread = threading.Thread(
-            target = self._connectivity_monitor_loop,
-            args = (check_interval,),
-            daemon = True
-        )
-        self.connectivity_thread.start()
-        #logging.info(f"Starting connectivity monitor (checking every {check_interval} seconds)")
-
-    def stop_connectivity_monitor(self):
-        """Stop the connectivity monitoring thread"""
-        self.stop_monitoring = True
-        if self.connectivity_thread:
-            self.connectivity_thread.join(timeout=1.0)  # Wait for thread to finish
-            logging.info("Stopped connectivity monitor")
-
-    def _connectivity_monitor_loop(self, check_interval):
-        """Background loop that periodically checks connectivity and retries transactions"""
-        while not self.stop_monitoring:
-            reconnect_needed = False
-            
-            # Check if we need to reconnect (either not connected or server might be gone)
-            if not self.is_connected:
-                reconnect_needed = True
-            else:
-                # Test the existing connection
-                try:
-                    # A simple health check - try to use the stub
-                    # This will throw an exception if the server is gone
-                    metadata = [('test', 'test')]
-                    self.stub.CheckBalance(payment_pb2.BalanceRequest(), metadata=metadata, timeout=2)
-                except:
-                    # If any error occurs, we need to reconnect
-                    #logging.info("Existing connection seems broken, reconnecting...")
-                    self.is_connected = False
-                    reconnect_needed = True
-                    
-            # Try to reconnect if needed
-            if reconnect_needed:
-                #logging.info("Connectivity monitor attempting to reconnect...")
-                # Close existing channel first if there is one
-                if self.channel:
+        # PendingWAL creates the directory itself
+        self.pending_wal = PendingWAL(self.pending_dir)
+        self._migrate_legacy_pending()
+
+        # In-memory index of outstanding payment ids plus a retry queue,
+        # rebuilt once from the WAL: has_pending_transactions becomes an
+        # O(1) set check and a reconnect drains the queue without re-reading
+        # the log. The state callback thread reads both, hence the lock.
+        self._pending_lock = threading.Lock()
+        outstanding = self.pending_wal.live()
+        self._pending_ids = set(outstanding)
+        self._retry_q = deque(outstanding.items())
+
+    def _migrate_legacy_pending(self):
+        """Fold any per-file pending transactions from older runs into the WAL
+
+        scandir batches the directory read into one getdents sweep, and the
+        unlinks go through a directory fd so each removal skips re-resolving
+        the full path.
+        """
+        dir_fd = os.open(self.pending_dir, os.O_DIRECTORY)
+        try:
+            with os.scandir(self.pending_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith('.json'):
+                        continue
+
+                    idempotency_key = entry.name[:-5]  # Remove .json extension
                     try:
-                        self.channel.close()
-                    except:
-                        pass
-                # Try to reconnect
-                self.connect()
-                
-            # If we're connected and authenticated, retry pending transactions
-            if self.is_connected and self.token and self.has_pending_transactions():
-                #logging.info("Connectivity monitor retrying pending transactions...")
-                self.retry_pending_transactions()
-                
-            # Sleep for the specified interval
-            time.sleep(check_interval)
+                        with open(entry.path, 'rb') as f:
+                            transaction = orjson.loads(f.read())
+                    except (orjson.JSONDecodeError, IOError) as e:
+                        logging.error(f"Error migrating pending transaction {entry.path}: {str(e)}")
+                        continue
+
+                    self.pending_wal.append(idempotency_key, transaction)
+                    os.unlink(entry.name, dir_fd=dir_fd)
+                    logging.info(f"Migrated legacy pending transaction: {idempotency_key}")
+        finally:
+            os.close(dir_fd)
+
+    def _on_state_change(self, connectivity):
+        """React to channel state transitions reported by gRPC
+
+        Replaces the old polling monitor that issued a CheckBalance probe
+        every 10 seconds: gRPC already watches the connection and handles
+        reconnecting with backoff, so the client only has to act on the
+        edge into READY - flush the pending queue - and otherwise stays
+        completely idle.
+        """
+        ready = connectivity == grpc.ChannelConnectivity.READY
+        was_connected = self.is_connected
+        self.is_connected = ready
+
+        if ready and not was_connected:
+            #logging.info("Channel became ready")
+            if self.token and self.has_pending_transactions():
+                self._retry_executor.submit(self.retry_pending_transactions)
 
     def has_pending_transactions(self):
         """Check if this client has any pending transactions"""
-        if not os.path.exists(self.pending_dir):
-            return False
-        
-        return any(f.endswith('.json') for f in os.listdir(self.pending_dir))
+        with self._pending_lock:
+            return bool(self._pending_ids)
 
 
 
@@ -109,35 +335,49 @@ class PaymentClient:
     def connect(self, server_address='localhost:50051'):
         """Connect to the payment gateway server with SSL/TLS"""
         try:
-            # Load client key and certificate
-            with open('certificate/client.key', 'rb') as f:
-                client_key = f.read()
-            with open('certificate/client.cert', 'rb') as f:
-                client_cert = f.read()
-            
-            # Load CA certificate for server validation
-            with open('certificate/ca.cert', 'rb') as f:
-                ca_cert = f.read()
-            
-            # Create SSL credentials
-            credentials = grpc.ssl_channel_credentials(
-                root_certificates=ca_cert,
-                private_key=client_key,
-                certificate_chain=client_cert
-            )
-            
-            # Create secure channel
-            self.channel = grpc.secure_channel(server_address, credentials)
-            
-            # Create a stub (client)
-            self.stub = payment_pb2_grpc.PaymentGatewayStub(self.channel)
-            
+            # TLS material is cached at module scope
+            credentials = _channel_credentials()
+
+            # Create a small pool of secure channels; cap the reconnect
+            # backoff so an outage doesn't leave retries waiting on a long
+            # exponential timer
+            # Keepalive pings catch dead NAT paths without probe RPCs
+            options = [
+                ('grpc.max_reconnect_backoff_ms', 5000),
+                ('grpc.use_local_subchannel_pool', 1),
+                ('grpc.keepalive_time_ms', 10000),
+                ('grpc.keepalive_timeout_ms', 5000),
+                ('grpc.keepalive_permit_without_calls', 1),
+                ('grpc.http2.max_pings_without_data', 0),
+            ]
+            self._channel_pool = [
+                grpc.secure_channel(server_address, credentials, options=options)
+                for _ in range(self.CHANNEL_POOL_SIZE)
+            ]
+            self._stubs = [payment_pb2_grpc.PaymentGatewayStub(ch) for ch in self._channel_pool]
+            self._stub_cycle = itertools.cycle(self._stubs)
+
+            # The first channel doubles as the control channel for auth,
+            # balance checks and connectivity tracking
+            self.channel = self._channel_pool[0]
+            self.stub = self._stubs[0]
+
+            # Track connectivity through channel state callbacks instead of
+            # polling with probe RPCs
+            self.channel.subscribe(self._on_state_change, try_to_connect=True)
+
+            # Pre-warm the pool so the first payment on each channel doesn't
+            # pay the TCP/TLS handshake
+            for ch in self._channel_pool:
+                try:
+                    grpc.channel_ready_future(ch).result(timeout=5)
+                except grpc.FutureTimeoutError:
+                    logging.warning("Channel warm-up timed out; continuing anyway")
+                    break
+
             self.is_connected = True
             #logging.info(f"Connected to payment gateway at {server_address}")
 
-            if self.is_connected:
-                self.start_connectivity_monitor()
-
             return self.is_connected
         
         except Exception as e:
@@ -155,7 +395,10 @@ class PaymentClient:
             payment_id = fixed_id
             logging.info("Used fixed payment")
         else:
-            payment_id = str(uuid.uuid4())
+            payment_id = hashlib.blake2b(
+                f"{self.client_id}:{next(self._pay_counter)}:{time.time_ns()}".encode(),
+                digest_size=16
+            ).hexdigest()
         
         # Save transaction in pending queue with payment_id
         self._add_to_pending_transactions(payment_id, {
@@ -178,25 +421,35 @@ class PaymentClient:
             else:
                 return False , message, payment_id
 
+    def _start_payment(self, payment_id, receiver_account, receiver_bank, amount):
+        """Issue a payment RPC without blocking and return the in-flight call"""
+        # Create payment request with payment_id for idempotency
+        request = payment_pb2.PaymentRequest(
+            token=self.token,  # Token is included in the request per your proto
+            sender_account="self",  # Use the authenticated account
+            receiver_account=receiver_account,
+            receiver_bank=receiver_bank,
+            amount=amount,
+            payment_id=payment_id  # Use payment_id for idempotency
+        )
+
+        metadata = [('token', self.token)]
+
+        # Round-robin payments across the channel pool. wait_for_ready parks
+        # the call until the channel reconnects instead of failing fast
+        stub = next(self._stub_cycle) if self._stub_cycle else self.stub
+        return stub.ProcessPayment.future(
+            request, metadata=metadata,
+            compression=grpc.Compression.Gzip,
+            wait_for_ready=True,
+            timeout=5
+        )
+
     def _send_payment(self, payment_id, receiver_account, receiver_bank, amount):
         """Send a payment request to the gateway"""
         try:
-            # Create payment request with payment_id for idempotency
-            request = payment_pb2.PaymentRequest(
-                token=self.token,  # Token is included in the request per your proto
-                sender_account="self",  # Use the authenticated account
-                receiver_account=receiver_account,
-                receiver_bank=receiver_bank,
-                amount=amount,
-                payment_id=payment_id  # Use payment_id for idempotency
-            )
-
+            response = self._start_payment(payment_id, receiver_account, receiver_bank, amount).result()
 
-            metadata = [('token', self.token)]
-            
-            # Call the payment service (no metadata needed as token is in request)
-            response = self.stub.ProcessPayment(request, metadata=metadata)
-            
             if response.success:
                 logging.info(f"Payment successful: {response.message}")
                 return True, response.message
@@ -215,22 +468,18 @@ class PaymentClient:
         
     def _add_to_pending_transactions(self, idempotency_key, transaction):
         """Add transaction to pending queue"""
-        # Ensure pending transactions directory exists
-        os.makedirs(self.pending_dir, exist_ok=True)
-        
-        # Save transaction details to file with idempotency key as filename
-        file_path = f"{self.pending_dir}/{idempotency_key}.json"
-        with open(file_path, 'w') as f:
-            json.dump(transaction, f)
-        
+        self.pending_wal.append(idempotency_key, transaction)
+        with self._pending_lock:
+            self._pending_ids.add(idempotency_key)
+            self._retry_q.append((idempotency_key, transaction))
         logging.info(f"Added transaction to pending queue: {idempotency_key}")
 
     def _remove_from_pending_transactions(self, idempotency_key):
         """Remove transaction from pending queue"""
-        file_path = f"{self.pending_dir}/{idempotency_key}.json"
-        if os.path.exists(file_path):
-            os.remove(file_path)
-            logging.info(f"Removed transaction from pending queue: {idempotency_key}")  
+        self.pending_wal.tombstone(idempotency_key)
+        with self._pending_lock:
+            self._pending_ids.discard(idempotency_key)
+        logging.info(f"Removed transaction from pending queue: {idempotency_key}")
       
     def retry_pending_transactions(self):
         """Retry all pending transactions for this client"""
@@ -238,49 +487,107 @@ class PaymentClient:
             logging.error("Not connected or not authenticated")
             return False, "Not connected or not authenticated"
         
-        # Get list of pending transaction files for this client only
-        if not os.path.exists(self.pending_dir):
+        # Drain the in-memory retry queue instead of re-scanning the WAL;
+        # entries already completed (e.g. the first send eventually landed)
+        # are filtered out against the pending index
+        pending = []
+        with self._pending_lock:
+            while self._retry_q:
+                idempotency_key, transaction = self._retry_q.popleft()
+                if idempotency_key in self._pending_ids:
+                    pending.append((idempotency_key, transaction))
+        if not pending:
             return True, "No pending transactions"
-        
-        pending_files = os.listdir(self.pending_dir)
+
+        # Prefer a single streaming call for the whole batch; fall back to
+        # concurrent unary calls against gateways without the batch RPC
+        try:
+            outcomes = self._retry_via_stream(pending)
+        except grpc.RpcError as e:
+            if e.code() == grpc.StatusCode.UNIMPLEMENTED:
+                outcomes = self._retry_via_unary(pending)
+            else:
+                # The stream died mid-batch; every payment is idempotent, so
+                # simply requeue them all for the next drain
+                logging.error(f"RPC error during batch retry: {e.code().name}")
+                with self._pending_lock:
+                    self._retry_q.extend(pending)
+                return False, f"Retry failed: {e.code().name}"
+
         success = True
-        retried_count = 0
         success_count = 0
-        
-        for file_name in pending_files:
-            if not file_name.endswith('.json'):
-                continue
-            
-            idempotency_key = file_name[:-5]  # Remove .json extension
-            file_path = f"{self.pending_dir}/{file_name}"
-            
-            # Load transaction details
-            with open(file_path, 'r') as f:
-                try:
-                    transaction = json.load(f)
-                except json.JSONDecodeError:
-                    logging.error(f"Error reading pending transaction: {file_path}")
-                    continue
-            
-            # Retry sending the payment
-            logging.info(f"Retrying pending transaction: {idempotency_key}")
-            retried_count += 1
-            
-            retry_success, message = self._send_payment(
-                idempotency_key,
-                transaction["receiver_account"],
-                transaction["receiver_bank"],
-                transaction["amount"]
-            )
-            
+        for idempotency_key, transaction, retry_success in outcomes:
             if retry_success:
                 success_count += 1
                 self._remove_from_pending_transactions(idempotency_key)
             else:
                 success = False
-        
-        result_message = f"Retried {retried_count} transactions, {success_count} succeeded"
+                # Still outstanding; put it back for the next drain
+                with self._pending_lock:
+                    self._retry_q.append((idempotency_key, transaction))
+
+        result_message = f"Retried {len(pending)} transactions, {success_count} succeeded"
         return success, result_message
+
+    def _retry_via_stream(self, pending):
+        """Replay the pending batch over one ProcessPayments stream
+
+        One HTTP/2 stream carries every queued payment, so headers and TLS
+        framing are paid once per batch instead of once per payment. The
+        gateway answers in request order, so responses zip with the batch.
+        """
+        requests = [
+            payment_pb2.PaymentRequest(
+                token=self.token,
+                sender_account="self",
+                receiver_account=transaction["receiver_account"],
+                receiver_bank=transaction["receiver_bank"],
+                amount=transaction["amount"],
+                payment_id=idempotency_key
+            )
+            for idempotency_key, transaction in pending
+        ]
+
+        logging.info(f"Retrying {len(requests)} pending transactions as one batch stream")
+        metadata = [('token', self.token)]
+        responses = self.stub.ProcessPayments(
+            iter(requests), metadata=metadata,
+            compression=grpc.Compression.Gzip,
+            wait_for_ready=True
+        )
+
+        return [
+            (idempotency_key, transaction, response.success)
+            for (idempotency_key, transaction), response in zip(pending, responses)
+        ]
+
+    def _retry_via_unary(self, pending):
+        """Replay the pending batch as concurrent unary calls
+
+        Fallback for gateways without the ProcessPayments batch RPC; a
+        window bounds how many payments are in flight at once.
+        """
+        outcomes = []
+        for start in range(0, len(pending), self.RETRY_MAX_IN_FLIGHT):
+            calls = []
+            for idempotency_key, transaction in pending[start:start + self.RETRY_MAX_IN_FLIGHT]:
+                logging.info(f"Retrying pending transaction: {idempotency_key}")
+                calls.append((idempotency_key, transaction, self._start_payment(
+                    idempotency_key,
+                    transaction["receiver_account"],
+                    transaction["receiver_bank"],
+                    transaction["amount"]
+                )))
+
+            for idempotency_key, transaction, call in calls:
+                try:
+                    retry_success = call.result().success
+                except grpc.RpcError as e:
+                    logging.error(f"RPC error during payment: {e.code().name}")
+                    retry_success = False
+                outcomes.append((idempotency_key, transaction, retry_success))
+
+        return outcomes
     
 
 
@@ -337,7 +644,12 @@ class PaymentClient:
             metadata = [('token', self.token)]
             
             # Call the balance service with both the request and metadata
-            response = self.stub.CheckBalance(request, metadata=metadata)
+            response = self.stub.CheckBalance(
+                request, metadata=metadata,
+                compression=grpc.Compression.Gzip,
+                wait_for_ready=True,
+                timeout=5
+            )
             
             if response.success:
                 logging.info(f"Balance: {response.balance}")
@@ -358,10 +670,16 @@ class PaymentClient:
     
     def close(self):
         """Close the connection to the server"""
-        self.stop_connectivity_monitor()
-    
+        self._retry_executor.shutdown(wait=False)
+
         if self.channel:
-            self.channel.close()
+            for ch in self._channel_pool:
+                ch.close()
+            self._channel_pool = []
+            self._stubs = []
+            self._stub_cycle = None
+            self.channel = None
+            self.stub = None
             self.is_connected = False
             self.token = None
             logging.info("Connection closed")
@@ -371,25 +689,12 @@ class PaymentClient:
 
     def get_pending_transactions(self):
         """Get a list of pending transactions for this client"""
-        if not os.path.exists(self.pending_dir):
-            return []
-        
         pending_transactions = []
-        for file_name in os.listdir(self.pending_dir):
-            if not file_name.endswith('.json'):
-                continue
-                
-            idempotency_key = file_name[:-5]  # Remove .json extension
-            file_path = f"{self.pending_dir}/{file_name}"
-            
-            try:
-                with open(file_path, 'r') as f:
-                    transaction = json.load(f)
-                    transaction['payment_id'] = idempotency_key
-                    pending_transactions.append(transaction)
-            except (json.JSONDecodeError, IOError) as e:
-                logging.error(f"Error reading pending transaction {file_path}: {str(e)}")
-        
+        for idempotency_key, transaction in self.pending_wal.live().items():
+            transaction = dict(transaction)
+            transaction['payment_id'] = idempotency_key
+            pending_transactions.append(transaction)
+
         return pending_transactions
     
 
@@ -1,12 +1,24 @@
+import collections
+import contextvars
+import functools
 import grpc
 from concurrent import futures
-import json
+import heapq
+import itertools
+import orjson
 import uuid
 import time
 import logging
+import logging.handlers
 import os
+import pathlib
+import secrets
+import signal
+import sys
 import threading
 
+from google.protobuf import json_format
+
 import protofiles.payment_pb2 as payment_pb2
 import protofiles.payment_pb2_grpc as payment_pb2_grpc
 
@@ -16,18 +28,97 @@ BANK_SERVERS = {
 }
 
 active_tokens = {}
-PROCESSED_KEYS = {}
+# Serializes writers of active_tokens (Authenticate, expiry cleanup, the
+# startup load). Readers stay lock-free: every mutation is an in-place
+# atomic dict op, never a rebind, so a concurrent read sees either the old
+# or the new entry - no torn state
+_tokens_lock = threading.Lock()
+
+
+class _TTLCache:
+    """Bounded idempotency cache: LRU eviction plus a per-entry TTL
+
+    Supports the dict operations the gateway uses (`in`, `[]`, `=`) so the
+    call sites are unchanged. Expired entries are dropped lazily on access;
+    size overflow evicts the least recently used entry. Without a bound,
+    PROCESSED_KEYS grows by one PaymentResponse per payment forever.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return False
+            if entry[0] < time.time():
+                del self._data[key]
+                return False
+            return True
+
+    def __getitem__(self, key):
+        with self._lock:
+            expires, value = self._data[key]
+            if expires < time.time():
+                del self._data[key]
+                raise KeyError(key)
+            self._data.move_to_end(key)
+            return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._data[key] = (time.time() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+PROCESSED_KEYS = _TTLCache(maxsize=100_000, ttl=24 * 3600)
+
+# Min-heap of (expires, token) so cleanup pops only what actually expired
+# instead of scanning the whole token table
+_expiry_heap = []
 
 TPC_TIMEOUT_SECONDS = 10
+# Handler threads mostly sit in bank RPCs, so the pool is sized well above
+# the CPU count; override with GATEWAY_WORKERS for load testing. Each
+# worker costs roughly a thread stack (~8 MiB virtual) - cheap next to the
+# network wait it absorbs.
+GATEWAY_WORKERS = int(os.environ.get("GATEWAY_WORKERS", 64))
 
 TOKEN_STORAGE_FILE = "data/active_tokens.json"
 
+# (token, user_info) resolved once per RPC by AuthInterceptor; service
+# methods read this instead of re-parsing metadata and re-indexing
+# active_tokens
+current_user = contextvars.ContextVar('grpc_user_info', default=None)
+
+# Transaction id of the payment being processed on this handler thread;
+# TxFilter stamps it onto every log record so call sites don't interpolate
+# it themselves and aggregators can index on tx= without regex parsing
+tx_ctx = contextvars.ContextVar('tx', default='-')
+
+
+class TxFilter(logging.Filter):
+    """Attach the current transaction id to each record as %(tx)s"""
+
+    def filter(self, record):
+        record.tx = tx_ctx.get()
+        return True
+
 def load_tokens():
     if not os.path.exists(TOKEN_STORAGE_FILE):
         return {}
     try:
-        with open(TOKEN_STORAGE_FILE, 'r') as f:
-            tokens = json.load(f)
+        with open(TOKEN_STORAGE_FILE, 'rb') as f:
+            tokens = orjson.loads(f.read())
             for token, info in tokens.items():
                 if "expires" in info:
                     info["expires"] = float(info["expires"])
@@ -39,87 +130,159 @@ def load_tokens():
         return {}
 
 def save_tokens(tokens):
-    """Save active tokens to persistent storage"""
+    """Save active tokens to persistent storage
+
+    Write-then-rename keeps the snapshot atomic: a crash mid-write leaves
+    the previous file intact instead of a truncated one that load_tokens
+    would reject, forcing every user to re-authenticate.
+    """
     os.makedirs(os.path.dirname(TOKEN_STORAGE_FILE), exist_ok=True)
-    
+
     try:
-        with open(TOKEN_STORAGE_FILE, 'w') as f:
-            json.dump(tokens, f, indent=2)
+        tmp_path = TOKEN_STORAGE_FILE + '.tmp'
+        payload = orjson.dumps(tokens)
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, payload)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, TOKEN_STORAGE_FILE)
         logging.info(f"Saved {len(tokens)} active tokens to storage")
     except Exception as e:
-        logging.error(f"Error saving tokens to storage: {str(e)}")   
+        logging.error(f"Error saving tokens to storage: {str(e)}")
+
+# Debounced persistence: callers set the event instead of rewriting the token
+# file inline, so a burst of logins coalesces into one disk write
+_save_pending = threading.Event()
+SAVE_COALESCE_SECONDS = 1.0
+
+
+def request_token_save():
+    """Ask the background writer to persist active_tokens soon"""
+    _save_pending.set()
+
+
+def _token_saver_loop():
+    while True:
+        _save_pending.wait()
+        _save_pending.clear()
+        # Let concurrent logins pile onto this write before it happens
+        time.sleep(SAVE_COALESCE_SECONDS)
+        with _tokens_lock:
+            snapshot = dict(active_tokens)
+        save_tokens(snapshot)
+
+
+def start_token_saver():
+    threading.Thread(target=_token_saver_loop, daemon=True, name="token-saver").start()
+
 
 def cleanup_expired_tokens():
-    """Remove expired tokens and save the active ones"""
-    global active_tokens
+    """Remove expired tokens and save the active ones
+
+    Pops expired entries off the expiry heap - O(k log N) for k actually
+    expired tokens - rather than rebuilding the whole dict. The equality
+    check discards heap entries made stale by a re-authentication.
+    """
     current_time = time.time()
-    expired_count = len(active_tokens)
-    
-    active_tokens = {
-        token: info for token, info in active_tokens.items()
-        if info["expires"] > current_time
-    }
-    
-    expired_count -= len(active_tokens)
-    
+    expired_count = 0
+
+    with _tokens_lock:
+        while _expiry_heap and _expiry_heap[0][0] <= current_time:
+            expires, token = heapq.heappop(_expiry_heap)
+            if active_tokens.get(token, {}).get("expires") == expires:
+                del active_tokens[token]
+                expired_count += 1
+
     if expired_count > 0:
         logging.info(f"Cleaned up {expired_count} expired tokens")
-        save_tokens(active_tokens)
-    
+        request_token_save()
+
     # Schedule the next cleanup
-    threading.Timer(3600, cleanup_expired_tokens).start()                 
+    threading.Timer(3600, cleanup_expired_tokens).start()
+
+
+def _rebuild_expiry_heap():
+    """Rebuild the expiry heap from active_tokens (startup only)"""
+    _expiry_heap[:] = [(info["expires"], token) for token, info in active_tokens.items()]
+    heapq.heapify(_expiry_heap)
 
 
 class AuthInterceptor(grpc.ServerInterceptor):
-    def __init__(self):
-        self.auth_required_methods = {
-            '/payment.PaymentGateway/CheckBalance',
-            '/payment.PaymentGateway/ProcessPayment',
-            '/payment.PaymentGateway/GetTransactionHistory'
-        }
-        super().__init__()
+    # Methods that require a valid session token; everything else (notably
+    # Authenticate) passes straight through
+    auth_required_methods = frozenset({
+        '/payment.PaymentGateway/CheckBalance',
+        '/payment.PaymentGateway/ProcessPayment',
+        '/payment.PaymentGateway/GetTransactionHistory'
+    })
+    # Interned dispatch table: one dict probe classifies the RPC, and the
+    # interned keys keep their hashes cached across requests
+    _auth_by_method = {sys.intern(m): True for m in auth_required_methods}
 
     def intercept_service(self, continuation, handler_call_details):
-        # Get method name
-        method = handler_call_details.method
-        
-        # Skip authentication for the Authenticate method
-        if method == '/payment.PaymentGateway/Authenticate':
+        # Unauthenticated methods skip metadata inspection entirely
+        if not self._auth_by_method.get(handler_call_details.method, False):
             return continuation(handler_call_details)
-        
-        # Check if method requires authentication
-        if method in self.auth_required_methods:
-            # Extract metadata
-            metadata = dict(handler_call_details.invocation_metadata)
-            
-            # Check if token is present
-            if 'token' not in metadata:
-                return self._unauthenticated_rpc()
-            
-            token = metadata['token']
-            
-            # Validate token exists and hasn't expired
-            if token not in active_tokens or active_tokens[token]["expires"] < time.time():
-                return self._unauthenticated_rpc()
-            
-            # Authorization checks based on method
-            user_info = active_tokens[token]
-            
-            if method == '/payment.PaymentGateway/CheckBalance':
-                # Extract account ID from request (will be done in the service method)
-                # For authorization, we'll check this in the service method
-                pass
-                
-            elif method == '/payment.PaymentGateway/ProcessPayment':
-                # For initiating payments, we'll check balance sufficiency in the service method
-                pass
-                
-            elif method == '/payment.PaymentGateway/GetTransactionHistory':
-                # For transaction history, we'll check account ownership in the service method
-                pass
-        
-        # Continue with the call if authentication passed
-        return continuation(handler_call_details)
+
+        # Single pass over the metadata tuple; no dict materialization
+        token = next(
+            (value for key, value in handler_call_details.invocation_metadata if key == 'token'),
+            None
+        )
+        if token is None:
+            return self._unauthenticated_rpc()
+
+        # Validate token exists and hasn't expired
+        user_info = active_tokens.get(token)
+        if user_info is None or user_info["expires"] < time.time():
+            return self._unauthenticated_rpc()
+
+        # Per-account authorization happens in the service methods, which
+        # know the request payload. Hand them the already-resolved user so
+        # they don't repeat the metadata parse and token lookup.
+        handler = continuation(handler_call_details)
+        if handler is None:
+            return None
+        return self._with_user_info(handler, (token, user_info))
+
+    @staticmethod
+    def _with_user_info(handler, resolved):
+        """Wrap a handler so current_user is set while the method runs"""
+        def wrap(behavior):
+            def wrapped(request_or_iterator, context):
+                ctx_token = current_user.set(resolved)
+                try:
+                    return behavior(request_or_iterator, context)
+                finally:
+                    current_user.reset(ctx_token)
+            return wrapped
+
+        if handler.request_streaming and handler.response_streaming:
+            return grpc.stream_stream_rpc_method_handler(
+                wrap(handler.stream_stream),
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer
+            )
+        elif handler.request_streaming:
+            return grpc.stream_unary_rpc_method_handler(
+                wrap(handler.stream_unary),
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer
+            )
+        elif handler.response_streaming:
+            return grpc.unary_stream_rpc_method_handler(
+                wrap(handler.unary_stream),
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer
+            )
+        else:
+            return grpc.unary_unary_rpc_method_handler(
+                wrap(handler.unary_unary),
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer
+            )
 
     #if token is inactive or expired
     def _unauthenticated_rpc(self):
@@ -142,42 +305,46 @@ class LoggingInterceptor(grpc.ServerInterceptor):
         # Extract method name
         method = handler_call_details.method
         method_name = method.split('/')[-1]
-        
-        # Extract client info - metadata is a tuple of (key, value) pairs
-        peer = 'unknown'
-        metadata_dict = dict(handler_call_details.invocation_metadata)
-        if 'peer' in metadata_dict:
-            peer = metadata_dict['peer']
-        
-        # Log the request start
-        self.logger.info(f"Request received: Method={method_name}, Client={peer}")
-        
+
+        # Only materialize metadata when the log level will actually emit;
+        # with logging filtered out the interceptor does no per-RPC work
+        client_id = "unauthenticated"
+        if self.logger.isEnabledFor(logging.INFO):
+            # Extract client info - metadata is a tuple of (key, value) pairs
+            metadata_dict = dict(handler_call_details.invocation_metadata)
+            peer = metadata_dict.get('peer', 'unknown')
+
+            # Log the request start
+            self.logger.info("Request received: Method=%s, Client=%s", method_name, peer)
+
+            # Extract token if present (for client identification)
+            if 'token' in metadata_dict and metadata_dict['token'] in active_tokens:
+                client_id = active_tokens[metadata_dict['token']].get('username', 'unknown')
+
         # Get the original handler by calling continuation
         handler = continuation(handler_call_details)
-        
+
         # If the handler doesn't exist, just return None
         if handler is None:
             return None
         
-        # Extract token if present (for client identification)
-        client_id = "unauthenticated"
-        if 'token' in metadata_dict and metadata_dict['token'] in active_tokens:
-            client_id = active_tokens[metadata_dict['token']].get('username', 'unknown')
-        
         # Create a wrapper function that will be called with the request
         def new_handler(request, server_context):
-            # Log request details
-            request_dict = {}
-            for field in request.DESCRIPTOR.fields:
+            # Log request details (a streaming request is an iterator, not a
+            # message, so there is nothing to introspect); the dict is only
+            # materialized when the log level will actually emit it
+            log_messages = self.logger.isEnabledFor(logging.INFO)
+            if log_messages and not handler.request_streaming:
+                request_dict = json_format.MessageToDict(
+                    request, preserving_proto_field_name=True
+                )
                 # Don't log passwords
-                if field.name == 'password':
-                    value = '********'
-                else:
-                    value = getattr(request, field.name)
-                request_dict[field.name] = value
-            
-            self.logger.info(f"Request details: Method={method_name}, Client={client_id}, Data={request_dict}")
-            
+                if 'password' in request_dict:
+                    request_dict['password'] = '********'
+
+                self.logger.info("Request details: Method=%s, Client=%s, Data=%s",
+                                 method_name, client_id, request_dict)
+
             try:
                 # Call the actual handler method using handler.unary_unary
                 if handler.request_streaming and handler.response_streaming:
@@ -195,26 +362,26 @@ class LoggingInterceptor(grpc.ServerInterceptor):
                     response = handler.unary_unary(request, server_context)
                 
                 # Log response details for unary responses
-                if not handler.response_streaming:
-                    response_dict = {}
-                    for field in response.DESCRIPTOR.fields:
-                        value = getattr(response, field.name)
-                        response_dict[field.name] = value
-                    
+                if log_messages and not handler.response_streaming:
+                    response_dict = json_format.MessageToDict(
+                        response, preserving_proto_field_name=True
+                    )
+
                     # For transaction methods, log special information
                     if method_name == 'ProcessPayment':
                         transaction_amount = getattr(request, 'amount', 'N/A')
                         transaction_status = getattr(response, 'status', 'N/A')
-                        self.logger.info(f"Transaction completed: Method={method_name}, Client={client_id}, "
-                                        f"Amount={transaction_amount}, Status={transaction_status}")
-                    
-                    self.logger.info(f"Response sent: Method={method_name}, Client={client_id}, Status=OK, Data={response_dict}")
-                
+                        self.logger.info("Transaction completed: Method=%s, Client=%s, Amount=%s, Status=%s",
+                                         method_name, client_id, transaction_amount, transaction_status)
+
+                    self.logger.info("Response sent: Method=%s, Client=%s, Status=OK, Data=%s",
+                                     method_name, client_id, response_dict)
+
                 return response
             
             except Exception as e:
                 # Log exceptions
-                self.logger.error(f"Error during {method_name}: Client={client_id}, Error={str(e)}")
+                self.logger.error("Error during %s: Client=%s, Error=%s", method_name, client_id, e)
                 raise
         
         # Create a new handler with our wrapper function
@@ -243,46 +410,244 @@ class LoggingInterceptor(grpc.ServerInterceptor):
                 response_serializer=handler.response_serializer
             )       
 
+@functools.lru_cache(maxsize=None)
+def _read_cert(name):
+    """Read one PEM file from certificate/; later callers get cached bytes
+
+    Both the bank channels and the server credentials use the same TLS
+    material, so each file is touched at most once per process. Call
+    _read_cert.cache_clear() if certificates are rotated.
+    """
+    return pathlib.Path('certificate', name).read_bytes()
+
+
+@functools.lru_cache(maxsize=1)
+def _bank_channel_credentials():
+    """Build the shared channel credentials for all bank connections once
+
+    _create_bank_stub used to re-read all three PEM files per bank; the
+    credentials are identical for every bank channel, so build them once.
+    """
+    return grpc.ssl_channel_credentials(
+        root_certificates=_read_cert('ca.cert'),
+        private_key=_read_cert('server.key'),
+        certificate_chain=_read_cert('server.cert')
+    )
+
+
+# Concurrent Prepare/Commit RPCs multiplex over the pooled connections
+# per bank; keepalives detect dead bank links early, and the local
+# subchannel pool keeps the pooled channels on distinct TCP connections.
+# Pings continue on idle connections (permit_without_calls, unlimited
+# pings without data) so the TCP/TLS session survives quiet periods and
+# the first prepare after an idle stretch doesn't pay a handshake out of
+# its 2PC budget.
+BANK_CHANNEL_OPTIONS = [
+    ('grpc.keepalive_time_ms', 20000),
+    ('grpc.keepalive_timeout_ms', 5000),
+    ('grpc.keepalive_permit_without_calls', 1),
+    ('grpc.http2.max_pings_without_data', 0),
+    ('grpc.max_concurrent_streams', 1000),
+    ('grpc.use_local_subchannel_pool', 1),
+]
+# Channels per bank: spreads concurrent 2PC traffic across several TCP
+# connections so one stream-limited connection can't serialize it
+BANK_POOL_SIZE = 4
+
+
+# Every bank channel created by _connect_bank, so serve() can close them
+# cleanly on shutdown
+_bank_channels = []
+
+
+def _connect_bank(bank_name, bank_address, ready_map):
+    """Create a pool of secure channels and stubs for one bank (mutual TLS)
+
+    Registers a connectivity callback on the pool's first channel that
+    keeps ready_map[bank_name] current: TRANSIENT_FAILURE and SHUTDOWN
+    mark the bank unavailable so requests fail fast instead of waiting
+    out the RPC timeout; any other state lets requests through while the
+    channel reconnects.
+    """
+    try:
+        # Create secure channels with the shared, cached credentials
+        channels = [
+            grpc.secure_channel(
+                bank_address,
+                _bank_channel_credentials(),
+                options=BANK_CHANNEL_OPTIONS
+            )
+            for _ in range(BANK_POOL_SIZE)
+        ]
+
+        # Watch connectivity in the background; try_to_connect starts
+        # dialing immediately instead of on the first RPC
+        ready_map[bank_name] = True
+
+        def _on_state_change(state, bank=bank_name):
+            ready = state not in (
+                grpc.ChannelConnectivity.TRANSIENT_FAILURE,
+                grpc.ChannelConnectivity.SHUTDOWN
+            )
+            if ready_map.get(bank) != ready:
+                ready_map[bank] = ready
+                logging.info(f"Bank {bank} connectivity changed: {state}")
+
+        channels[0].subscribe(_on_state_change, try_to_connect=True)
+        _bank_channels.extend(channels)
+
+        # Create the stubs
+        return [payment_pb2_grpc.BankServiceStub(ch) for ch in channels]
+
+    except Exception as e:
+        logging.error(f"Failed to connect to bank at {bank_address}: {str(e)}")
+        return None
+
+
+def build_bank_stubs():
+    """Connect to every configured bank exactly once
+
+    Channels carry a TLS + TCP + HTTP/2 handshake, so they are built at
+    startup and reused for the process lifetime; nothing on a request path
+    may create one. Returns (stubs, ready_map) for PaymentGatewayServicer.
+    """
+    stubs = {}
+    ready_map = {}
+    for bank_name, bank_address in BANK_SERVERS.items():
+        stubs[bank_name] = _connect_bank(bank_name, bank_address, ready_map)
+    return stubs, ready_map
+
+
+def warm_bank_channels(timeout=5):
+    """Drive every bank channel to READY before serving traffic
+
+    The TCP + TLS handshake otherwise happens lazily inside the first RPC,
+    charging 1-3 round trips against that transaction's 2PC budget. All
+    ready-futures are requested first so the handshakes overlap, then each
+    is awaited against the shared timeout; a bank that is down only costs
+    the timeout once, and its channel keeps reconnecting in the background.
+    """
+    deadline = time.monotonic() + timeout
+    ready_futures = [(ch, grpc.channel_ready_future(ch)) for ch in _bank_channels]
+    for channel, ready_future in ready_futures:
+        try:
+            ready_future.result(timeout=max(0.1, deadline - time.monotonic()))
+        except grpc.FutureTimeoutError:
+            logging.warning("Bank channel not ready after %ss; will connect lazily", timeout)
+
+
 class PaymentGatewayServicer(payment_pb2_grpc.PaymentGatewayServicer):
 
-    def __init__(self):
-        # Create connections to all bank servers
-        self.bank_stubs = {}
-        for bank_name, bank_address in BANK_SERVERS.items():
-            self.bank_stubs[bank_name] = self._create_bank_stub(bank_address)
-        
+    # Append-only coordinator decision log; a COMMIT record is fsynced
+    # between the vote and the commit dispatch, so a crash after the
+    # decision leaves a durable instruction to finish the transaction
+    COORD_WAL_PATH = "logs/coord.wal"
+
+    def __init__(self, bank_stubs=None, bank_ready=None):
+        # serve() builds the channels once and injects them; the fallback
+        # keeps direct instantiation working. _bank_ready tracks each
+        # channel's health so request paths can fail fast with one lookup.
+        if bank_stubs is None:
+            bank_stubs, bank_ready = build_bank_stubs()
+        self.bank_stubs = bank_stubs
+        self._bank_ready = bank_ready if bank_ready is not None else {}
+        # Round-robin iterators over each bank's stub pool
+        self._stub_cycles = {
+            bank: itertools.cycle(stubs)
+            for bank, stubs in self.bank_stubs.items() if stubs
+        }
+
+        # Finish any transaction a previous run decided to commit but did
+        # not mark DONE, then open the log for this run's decisions
+        os.makedirs(os.path.dirname(self.COORD_WAL_PATH), exist_ok=True)
+        self._recover_coordinator_wal()
+        self._coord_wal = open(self.COORD_WAL_PATH, 'ab', buffering=0)
+        self._coord_wal_lock = threading.Lock()
+
         logging.info(f"Payment Gateway initialized with connections to {len(self.bank_stubs)} banks")
 
-    def _create_bank_stub(self, bank_address):
-        """Create a secure connection to a bank server using mutual TLS"""
-        try:
-            # Load client key and certificate
-            with open('certificate/server.key', 'rb') as f:
-                client_key = f.read()
-            with open('certificate/server.cert', 'rb') as f:
-                client_cert = f.read()
-            
-            # Load CA certificate for server validation
-            with open('certificate/ca.cert', 'rb') as f:
-                ca_cert = f.read()
-            
-            # Create SSL credentials
-            credentials = grpc.ssl_channel_credentials(
-                root_certificates=ca_cert,
-                private_key=client_key,
-                certificate_chain=client_cert
-            )
-            
-            # Create secure channel
-            channel = grpc.secure_channel(bank_address, credentials)
-            
-            # Create a stub
-            return payment_pb2_grpc.BankServiceStub(channel)
-        
-        except Exception as e:
-            logging.error(f"Failed to connect to bank at {bank_address}: {str(e)}")
-            return None
-        
+    def _wal_commit_decision(self, global_tx_id, sender_bank, sender_tx_id,
+                             receiver_bank, receiver_tx_id):
+        """Durably record the decision to commit before telling the banks"""
+        record = (f"COMMIT {global_tx_id} {sender_bank} {sender_tx_id} "
+                  f"{receiver_bank} {receiver_tx_id}\n").encode()
+        with self._coord_wal_lock:
+            self._coord_wal.write(record)
+            os.fdatasync(self._coord_wal.fileno())
+
+    def _wal_done(self, global_tx_id):
+        """Mark a decided transaction as fully committed
+
+        No fsync: losing a DONE record only means recovery re-sends a
+        commit the banks answer idempotently, which is harmless.
+        """
+        with self._coord_wal_lock:
+            self._coord_wal.write(f"DONE {global_tx_id}\n".encode())
+
+    def _recover_coordinator_wal(self):
+        """Re-drive commits for COMMIT records with no matching DONE
+
+        Replaces full cross-bank reconciliation after a coordinator crash:
+        the only in-doubt transactions are the O(pending) unmatched COMMIT
+        entries. Entries whose retry still fails are carried into the fresh
+        log so the next restart tries again.
+        """
+        if not os.path.exists(self.COORD_WAL_PATH):
+            return
+
+        pending = {}
+        with open(self.COORD_WAL_PATH, 'rb') as f:
+            for line in f:
+                parts = line.decode(errors='replace').split()
+                if not parts:
+                    continue
+                if parts[0] == "COMMIT" and len(parts) == 6:
+                    pending[parts[1]] = parts[2:]
+                elif parts[0] == "DONE" and len(parts) == 2:
+                    pending.pop(parts[1], None)
+
+        unresolved = []
+        for global_tx_id, (sender_bank, sender_tx_id,
+                           receiver_bank, receiver_tx_id) in pending.items():
+            logging.warning("Recovering in-doubt transaction %s", global_tx_id)
+            resolved = True
+            for bank_name, tx_id in ((sender_bank, sender_tx_id),
+                                     (receiver_bank, receiver_tx_id)):
+                if bank_name not in self._stub_cycles:
+                    resolved = False
+                    continue
+                try:
+                    # An already-committed (or TTL-swept) half answers
+                    # "Transaction not prepared"; either way the bank holds
+                    # no prepared funds, so the entry is settled
+                    self._get_stub(bank_name).CommitTransaction(
+                        payment_pb2.CommitTransactionRequest(transaction_id=tx_id),
+                        timeout=TPC_TIMEOUT_SECONDS
+                    )
+                except grpc.RpcError as e:
+                    logging.error("Recovery commit for %s at %s failed: %s",
+                                  tx_id, bank_name, e.code().name if e.code() else e)
+                    resolved = False
+            if not resolved:
+                unresolved.append((global_tx_id, sender_bank, sender_tx_id,
+                                   receiver_bank, receiver_tx_id))
+
+        # Start a compact log containing only what is still in doubt
+        with open(self.COORD_WAL_PATH, 'wb') as f:
+            for entry in unresolved:
+                f.write(("COMMIT " + " ".join(entry) + "\n").encode())
+            f.flush()
+            os.fdatasync(f.fileno())
+
+    def _get_stub(self, bank_name):
+        """Pick the bank's next stub, spreading RPCs across the pool"""
+        return next(self._stub_cycles[bank_name])
+
+    def _bank_available(self, bank_name):
+        """Single-lookup availability check used on the request paths"""
+        return (self.bank_stubs.get(bank_name) is not None
+                and self._bank_ready.get(bank_name, True))
+
     def Authenticate(self, request, context):
         """Authenticates a user and provides a session token"""
         username = request.username
@@ -292,8 +657,8 @@ class PaymentGatewayServicer(payment_pb2_grpc.PaymentGatewayServicer):
         # Log authentication attempt (omitting password for security)
         logging.info(f"Authentication attempt: username={username}, bank={bank_name}")
         
-        # Validate bank exists
-        if bank_name not in self.bank_stubs or self.bank_stubs[bank_name] is None:
+        # Validate bank exists and its channel is healthy
+        if not self._bank_available(bank_name):
             error_msg = f"Bank {bank_name} not found or connection failed"
             logging.warning(f"Authentication failed: {error_msg}")
             
@@ -311,22 +676,28 @@ class PaymentGatewayServicer(payment_pb2_grpc.PaymentGatewayServicer):
                 username=username,
                 password=password
             )
-            verification_response = self.bank_stubs[bank_name].VerifyCredentials(verification_request)
+            verification_response = self._get_stub(bank_name).VerifyCredentials(verification_request)
             
             if verification_response.valid:
                 # Generate a session token (valid for 1 hour)
-                token = f"{username}-{uuid.uuid4()}"
+                # Opaque random token: cheaper to mint than a UUID and it no
+                # longer leaks the username; the user mapping lives in
+                # active_tokens[token] anyway
+                token = secrets.token_urlsafe(32)
                 expiry = time.time() + 3600  # 1 hour from now
                 
                 # Store the token with user info
-                active_tokens[token] = {
-                    "username": username,
-                    "bank": bank_name,
-                    "account": verification_response.account_id,
-                    "expires": expiry
-                }
-
-                save_tokens(active_tokens)
+                with _tokens_lock:
+                    active_tokens[token] = {
+                        "username": username,
+                        "bank": bank_name,
+                        "account": verification_response.account_id,
+                        "expires": expiry
+                    }
+                    heapq.heappush(_expiry_heap, (expiry, token))
+
+                # Off the RPC critical path: the token-saver thread writes soon
+                request_token_save()
                 
                 # Log successful authentication
                 logging.info(f"Authentication successful: username={username}, bank={bank_name}")
@@ -361,15 +732,24 @@ class PaymentGatewayServicer(payment_pb2_grpc.PaymentGatewayServicer):
             )
     def CheckBalance(self, request, context):
         """Returns the account balance for an authenticated user"""
-        # Extract token from metadata
-        metadata = dict(context.invocation_metadata())
-        token = metadata.get('token')
-        
-        # Get user info from token
-        user_info = active_tokens[token]
+        # The auth interceptor already resolved the caller
+        resolved = current_user.get()
+        if resolved is not None:
+            user_info = resolved[1]
+        else:
+            metadata = dict(context.invocation_metadata())
+            user_info = active_tokens.get(metadata.get('token'))
+        if user_info is None:
+            context.set_code(grpc.StatusCode.UNAUTHENTICATED)
+            context.set_details("Invalid or expired token")
+            return payment_pb2.BalanceResponse(
+                success=False,
+                balance=0,
+                message="Invalid or expired token"
+            )
         bank_name = user_info["bank"]
         account_id = user_info["account"]
-        
+
         # Authorization check: ensure the requested account belongs to the authenticated user
         if request.account_id and request.account_id != account_id:
             context.set_code(grpc.StatusCode.PERMISSION_DENIED)
@@ -383,7 +763,7 @@ class PaymentGatewayServicer(payment_pb2_grpc.PaymentGatewayServicer):
         try:
             # Forward request to the appropriate bank
             bank_request = payment_pb2.BankBalanceRequest(account_id=account_id)
-            bank_response = self.bank_stubs[bank_name].GetBalance(bank_request)
+            bank_response = self._get_stub(bank_name).GetBalance(bank_request)
             
             logging.info(f"Balance check for user {user_info['username']} at bank {bank_name}")
             
@@ -407,12 +787,20 @@ class PaymentGatewayServicer(payment_pb2_grpc.PaymentGatewayServicer):
 
     def GetTransactionHistory(self, request, context):
         """Get transaction history with authorization check"""
-        # Extract token from metadata
-        metadata = dict(context.invocation_metadata())
-        token = metadata.get('token')
-        
-        # Get user info from token
-        user_info = active_tokens[token]
+        # The auth interceptor already resolved the caller
+        resolved = current_user.get()
+        if resolved is not None:
+            user_info = resolved[1]
+        else:
+            metadata = dict(context.invocation_metadata())
+            user_info = active_tokens.get(metadata.get('token'))
+        if user_info is None:
+            context.set_code(grpc.StatusCode.UNAUTHENTICATED)
+            context.set_details("Invalid or expired token")
+            return payment_pb2.HistoryResponse(
+                success=False,
+                message="Invalid or expired token"
+            )
         bank_name = user_info["bank"]
         account_id = user_info["account"]
         
@@ -434,16 +822,17 @@ class PaymentGatewayServicer(payment_pb2_grpc.PaymentGatewayServicer):
                 limit=limit
             )
             
-            # Call the bank's GetTransactionHistory method
-            bank_response = self.bank_stubs[bank_name].GetTransactionHistory(bank_request)
-            
+            # The bank streams transactions back one at a time; collect them
+            # into the client's bulk response
+            transactions = list(self._get_stub(bank_name).GetTransactionHistory(bank_request))
+
             logging.info(f"Transaction history retrieved for user {user_info['username']} at bank {bank_name}")
-            
+
             # Return the history response to the client
             return payment_pb2.HistoryResponse(
-                success=bank_response.success,
-                transactions=bank_response.transactions,
-                message=bank_response.message
+                success=True,
+                transactions=transactions,
+                message=f"Retrieved {len(transactions)} transactions"
             )
             
         except grpc.RpcError as e:
@@ -460,19 +849,23 @@ class PaymentGatewayServicer(payment_pb2_grpc.PaymentGatewayServicer):
         """Process a payment with idempotency guarantee"""
         # Extract token directly from request
         token = request.token
-        
-        # Verify token is valid
-        if token not in active_tokens:
-            context.set_code(grpc.StatusCode.UNAUTHENTICATED)
-            context.set_details("Invalid authentication token")
-            return payment_pb2.PaymentResponse(
-                success=False,
-                status="failed",
-                message="Authentication failed: Invalid token"
-            )
-        
-        # Get sender info from token
-        sender_info = active_tokens[token]
+
+        # Reuse the interceptor's resolution when it matches this token
+        # (the batch streaming path arrives without it)
+        resolved = current_user.get()
+        if resolved is not None and resolved[0] == token:
+            sender_info = resolved[1]
+        else:
+            # Verify token is valid
+            sender_info = active_tokens.get(token)
+            if sender_info is None:
+                context.set_code(grpc.StatusCode.UNAUTHENTICATED)
+                context.set_details("Invalid authentication token")
+                return payment_pb2.PaymentResponse(
+                    success=False,
+                    status="failed",
+                    message="Authentication failed: Invalid token"
+                )
         sender_bank = sender_info["bank"]
         sender_account = sender_info["account"]
         
@@ -491,10 +884,10 @@ class PaymentGatewayServicer(payment_pb2_grpc.PaymentGatewayServicer):
         if payment_id and payment_id in PROCESSED_KEYS:
             cached_response = PROCESSED_KEYS[payment_id]
             if cached_response.success or not self._is_retriable_error(cached_response):
-                logging.info(f"Returning cached result for idempotent request: {payment_id}")
+                logging.info("Returning cached result for idempotent request: %s", payment_id)
                 return cached_response
             else:
-                logging.info(f"Previous attempt failed. So trying again: {payment_id}")
+                logging.info("Previous attempt failed. So trying again: %s", payment_id)
 
         
         # Get receiver info from request
@@ -505,31 +898,29 @@ class PaymentGatewayServicer(payment_pb2_grpc.PaymentGatewayServicer):
         # Check if receiver bank exists
         if receiver_bank not in self.bank_stubs:
             error_msg = f"Receiver bank {receiver_bank} not found"
-            response = payment_pb2.PaymentResponse(
-                success=False,
-                status="failed",
-                transaction_id="",
-                message=error_msg
-            )
-            
+            response = self._fail(error_msg)
+
             # Cache the response for idempotency
             if payment_id:
                 PROCESSED_KEYS[payment_id] = response
-            
+
             return response
+
+        # Known bank with an unhealthy channel: fail fast with a retriable
+        # error instead of letting the bank RPCs run out their timeouts
+        if not self._bank_available(receiver_bank) or not self._bank_available(sender_bank):
+            down_bank = receiver_bank if not self._bank_available(receiver_bank) else sender_bank
+            context.set_code(grpc.StatusCode.UNAVAILABLE)
+            context.set_details(f"Bank {down_bank} is unreachable")
+            return self._fail(f"Server unavailable: bank {down_bank} is unreachable")
         
         # Check if sender has sufficient funds
         try:
             balance_request = payment_pb2.BankBalanceRequest(account_id=sender_account)
-            balance_response = self.bank_stubs[sender_bank].GetBalance(balance_request)
+            balance_response = self._get_stub(sender_bank).GetBalance(balance_request)
             
             if not balance_response.success:
-                response = payment_pb2.PaymentResponse(
-                    success=False,
-                    status="failed",
-                    transaction_id="",
-                    message=f"Could not verify balance: {balance_response.message}"
-                )
+                response = self._fail(f"Could not verify balance: {balance_response.message}")
                 
                 # Cache the response for idempotency
                 if payment_id:
@@ -541,12 +932,7 @@ class PaymentGatewayServicer(payment_pb2_grpc.PaymentGatewayServicer):
             if balance_response.balance < amount:
                 context.set_code(grpc.StatusCode.PERMISSION_DENIED)
                 context.set_details("Insufficient funds")
-                response = payment_pb2.PaymentResponse(
-                    success=False,
-                    status="failed",
-                    transaction_id="",
-                    message=f"Authorization failed: Insufficient funds. Available: {balance_response.balance}, Required: {amount}"
-                )
+                response = self._fail(f"Authorization failed: Insufficient funds. Available: {balance_response.balance}, Required: {amount}")
                 
                 # Cache the response for idempotency
                 if payment_id:
@@ -570,40 +956,173 @@ class PaymentGatewayServicer(payment_pb2_grpc.PaymentGatewayServicer):
             return payment_response
         
         except grpc.RpcError as e:
-            logging.error(f"Error during payment: {e.code().name}")
+            logging.error("Error during payment: %s", e.code().name)
             context.set_code(e.code())
             context.set_details(f"Bank communication error: {e.details()}")
-            response = payment_pb2.PaymentResponse(
-                success=False,
-                status="failed",
-                transaction_id="",
-                message=f"Payment failed: {e.details()}"
-            )
-            
+            response = self._fail(f"Payment failed: {e.details()}")
+
             # Cache the response for idempotency
             if payment_id:
                 PROCESSED_KEYS[payment_id] = response
-            
+
             return response
-    
+
+        except Exception:
+            # Single top-level guard for genuinely unexpected failures; the
+            # narrowed handlers above and in the 2PC path only catch RPC
+            # errors. Not cached, so a retry gets a fresh attempt.
+            logging.exception("Unexpected error during payment processing")
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details("Internal gateway error")
+            return self._fail("Payment failed due to unexpected gateway error")
+
+    def ProcessPayments(self, request_iterator, context):
+        """Process a stream of payments, one response per request in order
+
+        Batch path used by clients flushing their pending queue: a single
+        HTTP/2 stream carries the whole batch, so headers, TLS records and
+        stream setup are paid once instead of per payment. Each payment
+        still goes through the full ProcessPayment path, including
+        idempotency and 2PC.
+        """
+        for request in request_iterator:
+            yield self.ProcessPayment(request, context)
+
+    # Most failure responses differ only in message and transaction id;
+    # copying a pre-built template skips the per-call kwargs handling in
+    # the protobuf constructor on every failure path
+    _FAILED_TEMPLATE = payment_pb2.PaymentResponse(
+        success=False,
+        status="failed",
+        transaction_id=""
+    )
+
+    @staticmethod
+    def _remaining(deadline):
+        """Seconds left until a monotonic deadline, floored at zero"""
+        return max(0.0, deadline - time.monotonic())
+
+    ABORT_TIMEOUT_SECONDS = 2  # Short timeout for aborts
+
+    def _abort_async(self, bank_name, tx_id):
+        """Issue AbortTransaction in the background; failures are only logged
+
+        Aborts sit on failure paths where the client is already getting an
+        error back; .future() hands the RPC to the channel and returns, so
+        the response isn't delayed by up to ABORT_TIMEOUT_SECONDS per bank
+        while a possibly-dead bank times out.
+        """
+        try:
+            abort_future = self._get_stub(bank_name).AbortTransaction.future(
+                payment_pb2.AbortTransactionRequest(transaction_id=tx_id),
+                timeout=self.ABORT_TIMEOUT_SECONDS
+            )
+        except grpc.RpcError as e:
+            logging.error("Error aborting transaction %s at bank %s: %s", tx_id, bank_name,
+                          e.code().name if e.code() else e)
+            return
+
+        def _log_failure(f, bank=bank_name, tx=tx_id):
+            error = f.exception()
+            if error is not None:
+                logging.error("Error aborting transaction %s at bank %s: %s", tx, bank, error)
+
+        abort_future.add_done_callback(_log_failure)
+
+    def _abort_both_async(self, sender_bank, sender_tx_id, receiver_bank, receiver_tx_id):
+        """Abort both halves of a transaction without blocking the caller"""
+        self._abort_async(sender_bank, sender_tx_id)
+        self._abort_async(receiver_bank, receiver_tx_id)
+
+    def _fail(self, message, transaction_id=""):
+        """Build a failed PaymentResponse from the shared template"""
+        response = payment_pb2.PaymentResponse()
+        response.CopyFrom(self._FAILED_TEMPLATE)
+        response.message = message
+        if transaction_id:
+            response.transaction_id = transaction_id
+        return response
+
+    # Failure messages that indicate a transient condition; responses
+    # matching these must not be cached as final idempotency results
+    _RETRIABLE_PATTERNS = (
+        "Bank communication error",
+        "Connection Failed",
+        "Timeout",
+        "timed out",
+        "Server unavailable"
+    )
+
     def _is_retriable_error(self, response):
-        retriable_error = [
-            "Bank communication error",
-            "Connection Failed",
-            "Timeout",
-            "Server unavailable"
-        ]
-        
+        """Whether a failed PaymentResponse reflects a transient error
+
+        This used to fall through without a return statement, so every
+        failed response was treated as final and cached - a retry with the
+        same payment_id would be answered from the cache instead of
+        re-attempted.
+        """
+        message = response.message
+        return any(pattern in message for pattern in self._RETRIABLE_PATTERNS)
+
+    def _one_phase_intrabank(self, payment_id, bank_name, sender_account, receiver_account, amount, global_transaction_id):
+        """Run an intra-bank transfer as one ExecuteTransfer call (1PC)
+
+        Both accounts live in the same bank, so the transfer is a single
+        atomic local transaction there - no votes to collect, nothing to
+        abort. The bank applies debit and credit under its own locks and
+        the call either succeeds completely or changes nothing.
+        """
+        logging.info("1PC intra-bank transfer: %s from %s to %s at %s",
+                     amount, sender_account, receiver_account, bank_name)
+
+        transfer_request = payment_pb2.ExecuteTransferRequest(
+            transaction_id=global_transaction_id,
+            sender_account=sender_account,
+            receiver_account=receiver_account,
+            amount=amount,
+            payment_id=payment_id
+        )
+
+        try:
+            transfer_response = self._get_stub(bank_name).ExecuteTransfer(
+                transfer_request,
+                timeout=TPC_TIMEOUT_SECONDS
+            )
+        except grpc.RpcError as e:
+            if e.code() == grpc.StatusCode.DEADLINE_EXCEEDED:
+                logging.error("Timeout during intra-bank transfer at %s", bank_name)
+                return self._fail("Transaction timed out during transfer", global_transaction_id)
+            logging.error("Error during intra-bank transfer at %s: %s", bank_name, e.code().name)
+            return self._fail(f"Error communicating with bank: {e.code().name}", global_transaction_id)
+
+        if not transfer_response.success:
+            logging.warning("Intra-bank transfer rejected: %s", transfer_response.message)
+            return self._fail(transfer_response.message, global_transaction_id)
+
+        return payment_pb2.PaymentResponse(
+            success=True,
+            transaction_id=global_transaction_id,
+            status="completed",
+            message="Payment processed successfully"
+        )
+
     def _process_payment_2pc(self, payment_id, sender_bank, sender_account, receiver_bank, receiver_account, amount):
         """Process payment using proper Two-Phase Commit with timeout"""
         global_transaction_id = str(uuid.uuid4())
-        
+        # From here on every log record on this thread carries tx=<id>
+        tx_ctx.set(global_transaction_id)
+
+        # Sentinels for the backstop handler: None means that half was never
+        # assigned a transaction, so there is nothing to abort
+        sender_tx_id = None
+        receiver_tx_id = None
+
         # Log payment request
-        logging.info(f"Processing payment with 2PC: {amount} from {sender_bank}/{sender_account} to {receiver_bank}/{receiver_account}")
+        logging.info("Processing payment with 2PC: %s from %s/%s to %s/%s", amount, sender_bank, sender_account, receiver_bank, receiver_account)
         
         # Skip the actual transfer if sender and receiver are the same
         if sender_bank == receiver_bank and sender_account == receiver_account:
-            logging.info(f"Self-transfer detected, no actual transfer needed")
+            logging.info("Self-transfer detected, no actual transfer needed")
             return payment_pb2.PaymentResponse(
                 success=True,
                 transaction_id=global_transaction_id,
@@ -614,30 +1133,48 @@ class PaymentGatewayServicer(payment_pb2_grpc.PaymentGatewayServicer):
         try:
             # Check if banks exist
             if sender_bank not in self.bank_stubs:
-                return payment_pb2.PaymentResponse(
-                    success=False,
-                    transaction_id="",
-                    status="failed",
-                    message=f"Sender bank {sender_bank} not found"
-                )
+                return self._fail(f"Sender bank {sender_bank} not found")
                 
             if receiver_bank not in self.bank_stubs:
-                return payment_pb2.PaymentResponse(
-                    success=False,
-                    transaction_id="",
-                    status="failed",
-                    message=f"Receiver bank {receiver_bank} not found"
+                return self._fail(f"Receiver bank {receiver_bank} not found")
+
+            # Intra-bank fast path: with a single participant there is
+            # nothing to coordinate, so one ExecuteTransfer call replaces
+            # the four RPCs of prepare/commit
+            if sender_bank == receiver_bank:
+                return self._one_phase_intrabank(
+                    payment_id, sender_bank, sender_account,
+                    receiver_account, amount, global_transaction_id
                 )
-            
+
+            # Resolve one pool stub per bank for the whole transaction, so
+            # prepare and commit ride the same HTTP/2 connection (and the
+            # per-call cycle lookup is paid once instead of four times)
+            sender_stub = self._get_stub(sender_bank)
+            receiver_stub = self._get_stub(receiver_bank)
+
             # Generate unique transaction IDs for each part
             sender_tx_id = f"{global_transaction_id}-sender-{payment_id}"
             receiver_tx_id = f"{global_transaction_id}-receiver-{payment_id}"
-            
-            # Record start time for timeout tracking
-            start_time = time.time()
-            
+
+            # Record start time for timeout tracking; deadlines use the
+            # monotonic clock so wall-clock adjustments can't cause spurious
+            # timeouts (or worse, deadlines that never arrive). One absolute
+            # deadline covers prepare AND commit - no per-phase reset - and
+            # its wall-clock equivalent travels to the banks in metadata so
+            # participants can bound their own waits against the same cutoff.
+            start_time = time.monotonic()
+            deadline = start_time + TPC_TIMEOUT_SECONDS
+            # Commit needs at least a second of the budget; precompute the
+            # guard so the post-prepare check is a single clock read
+            deadline_guard = deadline - 1.0
+            deadline_metadata = (
+                ('gateway-deadline-ns',
+                 str(time.time_ns() + TPC_TIMEOUT_SECONDS * 1_000_000_000)),
+            )
+
             # PHASE 1: Prepare - Ask all participants to vote
-            logging.info(f"2PC Phase 1: Prepare transactions")
+            logging.info("2PC Phase 1: Prepare transactions")
             
             # Create prepare requests
             sender_prepare_request = payment_pb2.PrepareTransactionRequest(
@@ -657,333 +1194,176 @@ class PaymentGatewayServicer(payment_pb2_grpc.PaymentGatewayServicer):
             )
             
             # Set timeout for prepare phase
-            deadline = time.time() + TPC_TIMEOUT_SECONDS
-            
-            # Prepare sender transaction (debit) with timeout
+            remaining = self._remaining(deadline)
+
+            # Dispatch both prepares concurrently; the two votes are
+            # independent, so their wall time overlaps instead of summing
+            sender_prepare_future = sender_stub.PrepareTransaction.future(
+                sender_prepare_request,
+                metadata=deadline_metadata,
+                timeout=remaining  # Remaining time until deadline
+            )
+            receiver_prepare_future = receiver_stub.PrepareTransaction.future(
+                receiver_prepare_request,
+                metadata=deadline_metadata,
+                timeout=remaining
+            )
+
+            # Build the commit requests while the prepare RPCs are on the
+            # wire: every transaction that survives the vote needs both, and
+            # constructing them here hides the protobuf setup inside the
+            # network wait instead of adding to it
+            commit_sender_request = payment_pb2.CommitTransactionRequest(
+                transaction_id=sender_tx_id
+            )
+            commit_receiver_request = payment_pb2.CommitTransactionRequest(
+                transaction_id=receiver_tx_id
+            )
+
+            # Collect the sender vote; on failure cancel the receiver's
+            # in-flight prepare, then abort in case it already prepared
             try:
-                sender_prepare_response = self.bank_stubs[sender_bank].PrepareTransaction(
-                    sender_prepare_request,
-                    timeout=max(0, deadline - time.time())  # Remaining time until deadline
-                )
-                
-                if not sender_prepare_response.ready:
-                    # If sender cannot prepare, abort the transaction
-                    logging.warning(f"Sender bank voted NO: {sender_prepare_response.message}")
-                    return payment_pb2.PaymentResponse(
-                        success=False,
-                        transaction_id=global_transaction_id,
-                        status="failed",
-                        message=f"Sender bank cannot process: {sender_prepare_response.message}"
-                    )
-                    
+                sender_prepare_response = sender_prepare_future.result()
             except grpc.RpcError as e:
-                # Handle timeout or other RPC errors
+                receiver_prepare_future.cancel()
+                self._abort_async(receiver_bank, receiver_tx_id)
+
                 if e.code() == grpc.StatusCode.DEADLINE_EXCEEDED:
-                    logging.error(f"Timeout while preparing transaction with sender bank")
-                    return payment_pb2.PaymentResponse(
-                        success=False,
-                        transaction_id=global_transaction_id,
-                        status="failed",
-                        message="Transaction timed out during preparation (sender)"
-                    )
+                    logging.error("Timeout while preparing transaction with sender bank")
+                    return self._fail("Transaction timed out during preparation (sender)", global_transaction_id)
                 else:
-                    logging.error(f"Error preparing transaction with sender bank: {e.code().name}")
-                    return payment_pb2.PaymentResponse(
-                        success=False,
-                        transaction_id=global_transaction_id,
-                        status="failed",
-                        message=f"Error communicating with sender bank: {e.code().name}"
-                    )
-            
-            # Check if we're approaching timeout
-            if time.time() > deadline - 1:  # Leave 1 second buffer
-                logging.error(f"Approaching timeout, aborting transaction")
-                # Abort the prepared transaction at sender
-                try:
-                    abort_sender_request = payment_pb2.AbortTransactionRequest(
-                        transaction_id=sender_tx_id
-                    )
-                    self.bank_stubs[sender_bank].AbortTransaction(
-                        abort_sender_request, 
-                        timeout=2  # Short timeout for abort
-                    )
-                except Exception as e:
-                    logging.error(f"Error aborting sender transaction after timeout: {str(e)}")
-                    
-                return payment_pb2.PaymentResponse(
-                    success=False,
-                    transaction_id=global_transaction_id,
-                    status="failed",
-                    message="Transaction timed out during preparation phase"
-                )
-            
-            # Prepare receiver transaction (credit) with timeout
+                    logging.error("Error preparing transaction with sender bank: %s", e.code().name)
+                    return self._fail(f"Error communicating with sender bank: {e.code().name}", global_transaction_id)
+
+            # Copy the fields out once; each protobuf attribute read walks
+            # the generated descriptor machinery
+            sender_ready = sender_prepare_response.ready
+            sender_vote_message = sender_prepare_response.message
+
+            if not sender_ready:
+                # If sender cannot prepare, abort the transaction
+                logging.warning("Sender bank voted NO: %s", sender_vote_message)
+                receiver_prepare_future.cancel()
+                self._abort_async(receiver_bank, receiver_tx_id)
+
+                return self._fail(f"Sender bank cannot process: {sender_vote_message}", global_transaction_id)
+
+            # Collect the receiver vote; sender is prepared by now, so any
+            # failure here must roll the sender back
             try:
-                receiver_prepare_response = self.bank_stubs[receiver_bank].PrepareTransaction(
-                    receiver_prepare_request,
-                    timeout=max(0, deadline - time.time())  # Remaining time until deadline
-                )
-                
-                if not receiver_prepare_response.ready:
+                receiver_prepare_response = receiver_prepare_future.result()
+                receiver_ready = receiver_prepare_response.ready
+                receiver_vote_message = receiver_prepare_response.message
+
+                if not receiver_ready:
                     # If receiver cannot prepare, abort both transactions
-                    logging.warning(f"Receiver bank voted NO: {receiver_prepare_response.message}")
-                    
+                    logging.warning("Receiver bank voted NO: %s", receiver_vote_message)
+
                     # Abort sender transaction
-                    try:
-                        abort_sender_request = payment_pb2.AbortTransactionRequest(
-                            transaction_id=sender_tx_id
-                        )
-                        self.bank_stubs[sender_bank].AbortTransaction(
-                            abort_sender_request, 
-                            timeout=2  # Short timeout for abort
-                        )
-                    except Exception as e:
-                        logging.error(f"Error aborting sender transaction: {str(e)}")
-                    
-                    return payment_pb2.PaymentResponse(
-                        success=False,
-                        transaction_id=global_transaction_id,
-                        status="failed",
-                        message=f"Receiver bank cannot process: {receiver_prepare_response.message}"
-                    )
-                    
+                    self._abort_async(sender_bank, sender_tx_id)
+
+                    return self._fail(f"Receiver bank cannot process: {receiver_vote_message}", global_transaction_id)
+
             except grpc.RpcError as e:
                 # Handle timeout or other RPC errors
                 if e.code() == grpc.StatusCode.DEADLINE_EXCEEDED:
-                    logging.error(f"Timeout while preparing transaction with receiver bank")
-                    
+                    logging.error("Timeout while preparing transaction with receiver bank")
+
                     # Abort sender transaction
-                    try:
-                        abort_sender_request = payment_pb2.AbortTransactionRequest(
-                            transaction_id=sender_tx_id
-                        )
-                        self.bank_stubs[sender_bank].AbortTransaction(
-                            abort_sender_request, 
-                            timeout=2  # Short timeout for abort
-                        )
-                    except Exception as abort_e:
-                        logging.error(f"Error aborting sender transaction: {str(abort_e)}")
-                    
-                    return payment_pb2.PaymentResponse(
-                        success=False,
-                        transaction_id=global_transaction_id,
-                        status="failed",
-                        message="Transaction timed out during preparation (receiver)"
-                    )
+                    self._abort_async(sender_bank, sender_tx_id)
+
+                    return self._fail("Transaction timed out during preparation (receiver)", global_transaction_id)
                 else:
-                    logging.error(f"Error preparing transaction with receiver bank: {e.code().name}")
-                    
+                    logging.error("Error preparing transaction with receiver bank: %s", e.code().name)
+
                     # Abort sender transaction
-                    try:
-                        abort_sender_request = payment_pb2.AbortTransactionRequest(
-                            transaction_id=sender_tx_id
-                        )
-                        self.bank_stubs[sender_bank].AbortTransaction(
-                            abort_sender_request, 
-                            timeout=2  # Short timeout for abort
-                        )
-                    except Exception as abort_e:
-                        logging.error(f"Error aborting sender transaction: {str(abort_e)}")
-                    
-                    return payment_pb2.PaymentResponse(
-                        success=False,
-                        transaction_id=global_transaction_id,
-                        status="failed",
-                        message=f"Error communicating with receiver bank: {e.code().name}"
-                    )
-            
+                    self._abort_async(sender_bank, sender_tx_id)
+
+                    return self._fail(f"Error communicating with receiver bank: {e.code().name}", global_transaction_id)
+
             # Check if we've exceeded the timeout
-            if time.time() > deadline - 1:  # Leave 1 second buffer
-                logging.error(f"Approaching timeout after preparation phase, aborting transaction")
+            if time.monotonic() > deadline_guard:
+                logging.error("Approaching timeout after preparation phase, aborting transaction")
                 
-                # Abort both prepared transactions
-                try:
-                    abort_sender_request = payment_pb2.AbortTransactionRequest(
-                        transaction_id=sender_tx_id
-                    )
-                    self.bank_stubs[sender_bank].AbortTransaction(
-                        abort_sender_request, 
-                        timeout=2  # Short timeout for abort
-                    )
-                except Exception as e:
-                    logging.error(f"Error aborting sender transaction after timeout: {str(e)}")
+                # Abort both prepared transactions in the background
+                self._abort_both_async(sender_bank, sender_tx_id, receiver_bank, receiver_tx_id)
                     
-                try:
-                    abort_receiver_request = payment_pb2.AbortTransactionRequest(
-                        transaction_id=receiver_tx_id
-                    )
-                    self.bank_stubs[receiver_bank].AbortTransaction(
-                        abort_receiver_request, 
-                        timeout=2  # Short timeout for abort
-                    )
-                except Exception as e:
-                    logging.error(f"Error aborting receiver transaction after timeout: {str(e)}")
-                    
-                return payment_pb2.PaymentResponse(
-                    success=False,
-                    transaction_id=global_transaction_id,
-                    status="failed",
-                    message="Transaction timed out before commit phase"
-                )
+                return self._fail("Transaction timed out before commit phase", global_transaction_id)
             
             # PHASE 2: Commit - Both banks voted YES, so commit the transactions
-            logging.info(f"2PC Phase 2: Commit transactions")
-            
-            # Set a new deadline for commit phase
-            deadline = time.time() + TPC_TIMEOUT_SECONDS
-            
-            # Commit sender transaction (debit) with timeout
+            logging.info("2PC Phase 2: Commit transactions")
+
+            # Durable decision point: once this record hits disk the
+            # transaction commits even if the gateway dies before either
+            # bank hears about it - recovery finishes it on restart
+            self._wal_commit_decision(global_transaction_id,
+                                      sender_bank, sender_tx_id,
+                                      receiver_bank, receiver_tx_id)
+
+            # The commit phase spends whatever is left of the single
+            # transaction budget; the pre-phase check above guarantees at
+            # least a second of it
+            remaining = self._remaining(deadline)
+
+            # Both participants voted YES, so the decision is commit; issue
+            # both commits concurrently. A failure past this point cannot be
+            # rolled back by aborting the other side - it is a critical state
+            # that needs recovery, so collect both outcomes before reporting.
+            sender_commit_future = sender_stub.CommitTransaction.future(
+                commit_sender_request,
+                metadata=deadline_metadata,
+                timeout=remaining
+            )
+            receiver_commit_future = receiver_stub.CommitTransaction.future(
+                commit_receiver_request,
+                metadata=deadline_metadata,
+                timeout=remaining
+            )
+
+            commit_errors = []
+
             try:
-                commit_sender_request = payment_pb2.CommitTransactionRequest(
-                    transaction_id=sender_tx_id
-                )
-                
-                commit_sender_response = self.bank_stubs[sender_bank].CommitTransaction(
-                    commit_sender_request,
-                    timeout=max(0, deadline - time.time())
-                )
-                
+                commit_sender_response = sender_commit_future.result()
                 if not commit_sender_response.success:
-                    # If sender commit fails, this is a critical error in 2PC
-                    logging.error(f"Critical 2PC error: Sender commit failed after both voted YES: {commit_sender_response.message}")
-                    
-                    # Abort receiver transaction
-                    try:
-                        abort_receiver_request = payment_pb2.AbortTransactionRequest(
-                            transaction_id=receiver_tx_id
-                        )
-                        self.bank_stubs[receiver_bank].AbortTransaction(
-                            abort_receiver_request, 
-                            timeout=2  # Short timeout for abort
-                        )
-                    except Exception as e:
-                        logging.error(f"Error aborting receiver transaction: {str(e)}")
-                    
-                    return payment_pb2.PaymentResponse(
-                        success=False,
-                        transaction_id=global_transaction_id,
-                        status="failed",
-                        message=f"Transaction failed during commit phase: {commit_sender_response.message}"
-                    )
-                    
+                    commit_errors.append(f"sender: {commit_sender_response.message}")
             except grpc.RpcError as e:
-                # Handle timeout or other RPC errors
                 if e.code() == grpc.StatusCode.DEADLINE_EXCEEDED:
-                    logging.error(f"Timeout while committing transaction with sender bank")
-                    
-                    # This is a critical state - we need to try to abort the receiver transaction
-                    try:
-                        abort_receiver_request = payment_pb2.AbortTransactionRequest(
-                            transaction_id=receiver_tx_id
-                        )
-                        self.bank_stubs[receiver_bank].AbortTransaction(
-                            abort_receiver_request, 
-                            timeout=2  # Short timeout for abort
-                        )
-                    except Exception as abort_e:
-                        logging.error(f"Error aborting receiver transaction: {str(abort_e)}")
-                    
-                    # We also need to try to abort the sender transaction, but it may have already committed
-                    try:
-                        abort_sender_request = payment_pb2.AbortTransactionRequest(
-                            transaction_id=sender_tx_id
-                        )
-                        self.bank_stubs[sender_bank].AbortTransaction(
-                            abort_sender_request, 
-                            timeout=2  # Short timeout for abort
-                        )
-                    except Exception as abort_e:
-                        logging.error(f"Error aborting sender transaction: {str(abort_e)}")
-                    
-                    return payment_pb2.PaymentResponse(
-                        success=False,
-                        transaction_id=global_transaction_id,
-                        status="failed",
-                        message="Transaction timed out during commit phase (sender)"
-                    )
+                    logging.error("Timeout while committing transaction with sender bank")
+                    commit_errors.append("sender: commit timed out")
                 else:
-                    logging.error(f"Error committing transaction with sender bank: {e.code().name}")
-                    
-                    # Abort receiver transaction
-                    try:
-                        abort_receiver_request = payment_pb2.AbortTransactionRequest(
-                            transaction_id=receiver_tx_id
-                        )
-                        self.bank_stubs[receiver_bank].AbortTransaction(
-                            abort_receiver_request, 
-                            timeout=2  # Short timeout for abort
-                        )
-                    except Exception as abort_e:
-                        logging.error(f"Error aborting receiver transaction: {str(abort_e)}")
-                    
-                    return payment_pb2.PaymentResponse(
-                        success=False,
-                        transaction_id=global_transaction_id,
-                        status="failed",
-                        message=f"Error committing to sender bank: {e.code().name}"
-                    )
-            
-            # Check if we've exceeded the timeout
-            if time.time() > deadline - 1:  # Leave 1 second buffer
-                logging.error(f"Approaching timeout after sender commit, critical state")
-                
-                # This is a critical state - sender committed but receiver hasn't
-                # We should still try to commit the receiver to maintain consistency
-                # In a real system, this would require a recovery protocol
-                
-                return payment_pb2.PaymentResponse(
-                    success=False,
-                    transaction_id=global_transaction_id,
-                    status="error",
-                    message="CRITICAL ERROR: Transaction timed out after sender committed. System may be in inconsistent state."
-                )
-            
-            # Commit receiver transaction (credit) with timeout
+                    logging.error("Error committing transaction with sender bank: %s", e.code().name)
+                    commit_errors.append(f"sender: {e.code().name}")
+
             try:
-                commit_receiver_request = payment_pb2.CommitTransactionRequest(
-                    transaction_id=receiver_tx_id
-                )
-                
-                commit_receiver_response = self.bank_stubs[receiver_bank].CommitTransaction(
-                    commit_receiver_request,
-                    timeout=max(0, deadline - time.time())
-                )
-                
+                commit_receiver_response = receiver_commit_future.result()
                 if not commit_receiver_response.success:
-                    # If receiver commit fails, this is a critical error in 2PC
-                    logging.error(f"Critical 2PC error: Receiver commit failed after sender committed: {commit_receiver_response.message}")
-                    
-                    return payment_pb2.PaymentResponse(
-                        success=False,
-                        transaction_id=global_transaction_id,
-                        status="error",
-                        message=f"CRITICAL ERROR: Sender debited but receiver credit failed: {commit_receiver_response.message}"
-                    )
-                    
+                    commit_errors.append(f"receiver: {commit_receiver_response.message}")
             except grpc.RpcError as e:
-                # Handle timeout or other RPC errors
                 if e.code() == grpc.StatusCode.DEADLINE_EXCEEDED:
-                    logging.error(f"Timeout while committing transaction with receiver bank")
-                    
-                    return payment_pb2.PaymentResponse(
-                        success=False,
-                        transaction_id=global_transaction_id,
-                        status="error",
-                        message="CRITICAL ERROR: Transaction timed out during commit phase (receiver). Sender was debited but receiver may not be credited."
-                    )
+                    logging.error("Timeout while committing transaction with receiver bank")
+                    commit_errors.append("receiver: commit timed out")
                 else:
-                    logging.error(f"Error committing transaction with receiver bank: {e.code().name}")
-                    
-                    return payment_pb2.PaymentResponse(
-                        success=False,
-                        transaction_id=global_transaction_id,
-                        status="error",
-                        message=f"CRITICAL ERROR: Error committing to receiver bank: {e.code().name}. Sender was debited but receiver may not be credited."
-                    )
-            
+                    logging.error("Error committing transaction with receiver bank: %s", e.code().name)
+                    commit_errors.append(f"receiver: {e.code().name}")
+
+            if commit_errors:
+                # If any commit fails after both voted YES, this is a critical
+                # error in 2PC - the banks may be in an inconsistent state
+                failure_detail = "; ".join(commit_errors)
+                logging.error("Critical 2PC error: commit failed after both voted YES: %s", failure_detail)
+
+                return payment_pb2.PaymentResponse(
+                    success=False,
+                    transaction_id=global_transaction_id,
+                    status="error",
+                    message=f"CRITICAL ERROR: Commit phase failed ({failure_detail}). System may be in inconsistent state."
+                )
+
+            self._wal_done(global_transaction_id)
+
             # Calculate and log total transaction time
-            total_time = time.time() - start_time
-            logging.info(f"2PC completed successfully in {total_time:.2f} seconds for transaction {global_transaction_id}")
+            total_time = time.monotonic() - start_time
+            logging.info("2PC completed successfully in %.2f seconds", total_time)
             
             # Both transactions committed successfully
             return payment_pb2.PaymentResponse(
@@ -993,128 +1373,110 @@ class PaymentGatewayServicer(payment_pb2_grpc.PaymentGatewayServicer):
                 message="Payment processed successfully"
             )
             
-        except Exception as e:
-            logging.error(f"Unexpected error during 2PC: {str(e)}")
-            
+        except grpc.RpcError as e:
+            # Backstop for RPC failures outside the per-call handlers above;
+            # anything that is not an RPC error is a programming error and
+            # propagates to ProcessPayment's outer guard. The banks' prepare
+            # TTL sweeper reclaims any entry the aborts below miss.
+            logging.error("Unexpected RPC error during 2PC: %s", e.code().name if e.code() else e)
+
             # Try to abort any prepared transactions
-            try:
-                if 'sender_tx_id' in locals():
-                    abort_sender_request = payment_pb2.AbortTransactionRequest(
-                        transaction_id=sender_tx_id
-                    )
-                    self.bank_stubs[sender_bank].AbortTransaction(
-                        abort_sender_request,
-                        timeout=2  # Short timeout for abort
-                    )
-                
-                if 'receiver_tx_id' in locals():
-                    abort_receiver_request = payment_pb2.AbortTransactionRequest(
-                        transaction_id=receiver_tx_id
-                    )
-                    self.bank_stubs[receiver_bank].AbortTransaction(
-                        abort_receiver_request,
-                        timeout=2  # Short timeout for abort
-                    )
-            except Exception as abort_error:
-                logging.error(f"Error during abort after exception: {str(abort_error)}")
-            
-            return payment_pb2.PaymentResponse(
-                success=False,
-                transaction_id=global_transaction_id if 'global_transaction_id' in locals() else "",
-                status="failed",
-                message=f"Payment failed due to unexpected error: {str(e)}"
-            )
+            if sender_tx_id is not None:
+                self._abort_async(sender_bank, sender_tx_id)
+
+            if receiver_tx_id is not None:
+                self._abort_async(receiver_bank, receiver_tx_id)
+
+            return self._fail(f"Payment failed due to bank communication error: {e.code().name if e.code() else e}",
+                              global_transaction_id)
 
 def serve():
 
 
     os.makedirs("logs", exist_ok=True)
 
+    logger_format = '%(asctime)s - PaymentGateway - %(levelname)s - tx=%(tx)s - %(message)s'
 
-        # Clear previous log file
-    with open("logs/gateway.log", 'w') as f:
-        f.write("")  # Write empty string to clear the file
-    
-    # Configure both the root logger and the gateway_logger
-    logger_format = '%(asctime)s - PaymentGateway - %(levelname)s - %(message)s'
-    
-    # Root logger setup
+    # One rotating file handler instead of truncate-on-start: old logs
+    # survive a restart (rotated, disk use bounded) and there is no race
+    # between the truncating open and the handler reopening the same file.
+    # delay=True defers opening the file until the first write.
+    file_handler = logging.handlers.RotatingFileHandler(
+        "logs/gateway.log", maxBytes=10_000_000, backupCount=5, delay=True
+    )
+    console_handler = logging.StreamHandler()
+
+    # Stamp the per-request transaction id onto every record; the filter
+    # sits on the handlers so both root and gateway_logger records get it
+    tx_filter = TxFilter()
+    file_handler.addFilter(tx_filter)
+    console_handler.addFilter(tx_filter)
+
+    # Root logger setup; clearing existing handlers first keeps this
+    # idempotent so a re-run (or a stray second call) can't double every
+    # log record
+    logging.root.handlers.clear()
     logging.basicConfig(
         level=logging.INFO,
         format=logger_format,
-        handlers=[
-            logging.FileHandler("logs/gateway.log"),
-            logging.StreamHandler()
-        ]
+        handlers=[file_handler, console_handler]
     )
-    
-    # Configure gateway_logger separately
+
+    # gateway_logger shares the SAME handler instances as root; giving it
+    # its own FileHandler on the same path would mean two open file
+    # descriptors and two write syscalls per record
     gateway_logger = logging.getLogger('gateway_logger')
     gateway_logger.setLevel(logging.INFO)
-    
-    # Clear any existing handlers to avoid duplicates
-    if gateway_logger.handlers:
-        gateway_logger.handlers.clear()
-        
-    # Add the same handlers to gateway_logger
-    file_handler = logging.FileHandler("logs/gateway.log")
-    file_handler.setFormatter(logging.Formatter(logger_format))
+    gateway_logger.handlers.clear()
     gateway_logger.addHandler(file_handler)
-    
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(logging.Formatter(logger_format))
     gateway_logger.addHandler(console_handler)
-    
+
     # Ensure gateway_logger doesn't propagate to root logger to avoid duplicate logs
     gateway_logger.propagate = False
 
 
 
 
-    global active_tokens
-    active_tokens = load_tokens()
+    loaded_tokens = load_tokens()
     current_time = time.time()
-    active_tokens = {
-        token: info for token, info in active_tokens.items()
-        if info["expires"] > current_time
-    }
-
-    #Why am I setting up logging here? 
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - PaymentGateway - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler("logs/gateway.log"),
-            logging.StreamHandler()
-        ]
-    )
+    with _tokens_lock:
+        # Update in place rather than rebinding the global so readers never
+        # hold a reference to a stale dict
+        active_tokens.clear()
+        active_tokens.update(
+            (token, info) for token, info in loaded_tokens.items()
+            if info["expires"] > current_time
+        )
+        _rebuild_expiry_heap()
 
+    start_token_saver()
     cleanup_expired_tokens()
 
-    with open('certificate/server.key', 'rb') as f:
-        server_key = f.read()
-    with open('certificate/server.cert', 'rb') as f:
-        server_cert = f.read()
+    server_key = _read_cert('server.key')
+    server_cert = _read_cert('server.cert')
+    ca_cert = _read_cert('ca.cert')
 
-    
-    with open('certificate/ca.cert', 'rb') as f:
-        ca_cert = f.read()
-    
-        server_credentials = grpc.ssl_server_credentials(
+    server_credentials = grpc.ssl_server_credentials(
         [(server_key, server_cert)],
         root_certificates=ca_cert,
         require_client_auth=True  # Enable mutual TLS
     )
 
 
+    # Bank channels are created here, once, and live for the whole process;
+    # warming them moves the TLS handshakes out of the first transactions
+    bank_stubs, bank_ready = build_bank_stubs()
+    warm_bank_channels()
+
     auth_interceptor = AuthInterceptor()
     logging_interceptor = LoggingInterceptor()    
 
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10),
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=GATEWAY_WORKERS,
+                                                    thread_name_prefix="gw-rpc"),
                          interceptors=[auth_interceptor, logging_interceptor])
 
     payment_pb2_grpc.add_PaymentGatewayServicer_to_server(
-        PaymentGatewayServicer(), server
+        PaymentGatewayServicer(bank_stubs, bank_ready), server
     )
 
     server_address = '[::]:50051'
@@ -1123,12 +1485,24 @@ def serve():
     server.start()
     logging.info(f"Payment Gateway started securely at {server_address}")
 
+    # Shut down with enough grace for in-flight 2PC rounds to reach commit
+    # or abort; stop(0) would drop coordinators mid-transaction and leave
+    # banks stuck in PREPARED state until recovery
+    def _graceful_stop():
+        logging.info("Payment Gateway shutting down...")
+        server.stop(grace=TPC_TIMEOUT_SECONDS + 5).wait()
+
+    # Container orchestrators send SIGTERM; route it through the same path
+    # as Ctrl-C so redeploys don't orphan prepared transactions
+    signal.signal(signal.SIGTERM, lambda *_: _graceful_stop())
 
     try:
         server.wait_for_termination()
     except KeyboardInterrupt:
-        logging.info("Payment Gateway shutting down...")
-        server.stop(0)
+        _graceful_stop()
+    finally:
+        for channel in _bank_channels:
+            channel.close()
 
 if __name__ == '__main__':
     serve()
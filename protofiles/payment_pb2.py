@@ -2,7 +2,7 @@
 # Generated by the protocol buffer compiler.  DO NOT EDIT!
 # NO CHECKED-IN PROTOBUF GENCODE
 # source: payment.proto
-# Protobuf Python Version: 5.29.0
+# Protobuf Python Version: 7.35.1
 """Generated protocol buffer code."""
 from google.protobuf import descriptor as _descriptor
 from google.protobuf import descriptor_pool as _descriptor_pool
@@ -11,9 +11,9 @@ from google.protobuf import symbol_database as _symbol_database
 from google.protobuf.internal import builder as _builder
 _runtime_version.ValidateProtobufRuntimeVersion(
     _runtime_version.Domain.PUBLIC,
-    5,
-    29,
-    0,
+    7,
+    35,
+    1,
     '',
     'payment.proto'
 )
@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rpayment.proto\x12\x07payment\"t\n\x16\x42\x61nkTransactionRequest\x12\x12\n\naccount_id\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t\x12\x0e\n\x06\x61mount\x18\x03 \x01(\x01\x12\x14\n\x0c\x63ounterparty\x18\x04 \x01(\t\x12\x12\n\npayment_id\x18\x05 \x01(\t\"{\n\x19PrepareTransactionRequest\x12\x16\n\x0etransaction_id\x18\x01 \x01(\t\x12\x12\n\naccount_id\x18\x02 \x01(\t\x12\x0c\n\x04type\x18\x03 \x01(\t\x12\x0e\n\x06\x61mount\x18\x04 \x01(\x01\x12\x14\n\x0c\x63ounterparty\x18\x05 \x01(\t\"<\n\x1aPrepareTransactionResponse\x12\r\n\x05ready\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"2\n\x18\x43ommitTransactionRequest\x12\x16\n\x0etransaction_id\x18\x01 \x01(\t\"=\n\x19\x43ommitTransactionResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"1\n\x17\x41\x62ortTransactionRequest\x12\x16\n\x0etransaction_id\x18\x01 \x01(\t\"<\n\x18\x41\x62ortTransactionResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\";\n\x17\x42\x61nkTransactionResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"7\n\x12\x42\x61nkHistoryRequest\x12\x12\n\naccount_id\x18\x01 \x01(\t\x12\r\n\x05limit\x18\x02 \x01(\x05\"c\n\x13\x42\x61nkHistoryResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12*\n\x0ctransactions\x18\x02 \x03(\x0b\x32\x14.payment.Transaction\x12\x0f\n\x07message\x18\x03 \x01(\t\"(\n\x12\x42\x61nkBalanceRequest\x12\x12\n\naccount_id\x18\x01 \x01(\t\"H\n\x13\x42\x61nkBalanceResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07\x62\x61lance\x18\x02 \x01(\x01\x12\x0f\n\x07message\x18\x03 \x01(\t\"D\n\x0b\x41uthRequest\x12\x10\n\x08username\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\x12\x11\n\tbank_name\x18\x03 \x01(\t\"?\n\x0c\x41uthResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\r\n\x05token\x18\x02 \x01(\t\x12\x0f\n\x07message\x18\x03 \x01(\t\"C\n\x1d\x43redentialVerificationRequest\x12\x10\n\x08username\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\"T\n\x1e\x43redentialVerificationResponse\x12\r\n\x05valid\x18\x01 \x01(\x08\x12\x12\n\naccount_id\x18\x02 \x01(\t\x12\x0f\n\x07message\x18\x03 \x01(\t\"3\n\x0e\x42\x61lanceRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x12\n\naccount_id\x18\x02 \x01(\t\"D\n\x0f\x42\x61lanceResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07\x62\x61lance\x18\x02 \x01(\x01\x12\x0f\n\x07message\x18\x03 \x01(\t\"\x8c\x01\n\x0ePaymentRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x16\n\x0esender_account\x18\x02 \x01(\t\x12\x18\n\x10receiver_account\x18\x03 \x01(\t\x12\x15\n\rreceiver_bank\x18\x04 \x01(\t\x12\x0e\n\x06\x61mount\x18\x05 \x01(\x01\x12\x12\n\npayment_id\x18\x06 \x01(\t\"[\n\x0fPaymentResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x16\n\x0etransaction_id\x18\x02 \x01(\t\x12\x0e\n\x06status\x18\x03 \x01(\t\x12\x0f\n\x07message\x18\x04 \x01(\t\"B\n\x0eHistoryRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x12\n\naccount_id\x18\x02 \x01(\t\x12\r\n\x05limit\x18\x03 \x01(\x05\"|\n\x0bTransaction\x12\x16\n\x0etransaction_id\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t\x12\x0e\n\x06\x61mount\x18\x03 \x01(\x01\x12\x14\n\x0c\x63ounterparty\x18\x04 \x01(\t\x12\x11\n\ttimestamp\x18\x05 \x01(\t\x12\x0e\n\x06status\x18\x06 \x01(\t\"_\n\x0fHistoryResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12*\n\x0ctransactions\x18\x02 \x03(\x0b\x32\x14.payment.Transaction\x12\x0f\n\x07message\x18\x03 \x01(\t2\xa9\x02\n\x0ePaymentGateway\x12=\n\x0c\x41uthenticate\x12\x14.payment.AuthRequest\x1a\x15.payment.AuthResponse\"\x00\x12\x43\n\x0c\x43heckBalance\x12\x17.payment.BalanceRequest\x1a\x18.payment.BalanceResponse\"\x00\x12\x45\n\x0eProcessPayment\x12\x17.payment.PaymentRequest\x1a\x18.payment.PaymentResponse\"\x00\x12L\n\x15GetTransactionHistory\x12\x17.payment.HistoryRequest\x1a\x18.payment.HistoryResponse\"\x00\x32\x8b\x05\n\x0b\x42\x61nkService\x12\x66\n\x11VerifyCredentials\x12&.payment.CredentialVerificationRequest\x1a\'.payment.CredentialVerificationResponse\"\x00\x12I\n\nGetBalance\x12\x1b.payment.BankBalanceRequest\x1a\x1c.payment.BankBalanceResponse\"\x00\x12Y\n\x12ProcessTransaction\x12\x1f.payment.BankTransactionRequest\x1a .payment.BankTransactionResponse\"\x00\x12T\n\x15GetTransactionHistory\x12\x1b.payment.BankHistoryRequest\x1a\x1c.payment.BankHistoryResponse\"\x00\x12_\n\x12PrepareTransaction\x12\".payment.PrepareTransactionRequest\x1a#.payment.PrepareTransactionResponse\"\x00\x12\\\n\x11\x43ommitTransaction\x12!.payment.CommitTransactionRequest\x1a\".payment.CommitTransactionResponse\"\x00\x12Y\n\x10\x41\x62ortTransaction\x12 .payment.AbortTransactionRequest\x1a!.payment.AbortTransactionResponse\"\x00\x62\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rpayment.proto\x12\x07payment\"t\n\x16\x42\x61nkTransactionRequest\x12\x12\n\naccount_id\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t\x12\x0e\n\x06\x61mount\x18\x03 \x01(\x01\x12\x14\n\x0c\x63ounterparty\x18\x04 \x01(\t\x12\x12\n\npayment_id\x18\x05 \x01(\t\"\x86\x01\n\x16\x45xecuteTransferRequest\x12\x16\n\x0etransaction_id\x18\x01 \x01(\t\x12\x16\n\x0esender_account\x18\x02 \x01(\t\x12\x18\n\x10receiver_account\x18\x03 \x01(\t\x12\x0e\n\x06\x61mount\x18\x04 \x01(\x01\x12\x12\n\npayment_id\x18\x05 \x01(\t\";\n\x17\x45xecuteTransferResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"{\n\x19PrepareTransactionRequest\x12\x16\n\x0etransaction_id\x18\x01 \x01(\t\x12\x12\n\naccount_id\x18\x02 \x01(\t\x12\x0c\n\x04type\x18\x03 \x01(\t\x12\x0e\n\x06\x61mount\x18\x04 \x01(\x01\x12\x14\n\x0c\x63ounterparty\x18\x05 \x01(\t\"<\n\x1aPrepareTransactionResponse\x12\r\n\x05ready\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"2\n\x18\x43ommitTransactionRequest\x12\x16\n\x0etransaction_id\x18\x01 \x01(\t\"=\n\x19\x43ommitTransactionResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"1\n\x17\x41\x62ortTransactionRequest\x12\x16\n\x0etransaction_id\x18\x01 \x01(\t\"<\n\x18\x41\x62ortTransactionResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\";\n\x17\x42\x61nkTransactionResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"7\n\x12\x42\x61nkHistoryRequest\x12\x12\n\naccount_id\x18\x01 \x01(\t\x12\r\n\x05limit\x18\x02 \x01(\x05\"c\n\x13\x42\x61nkHistoryResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12*\n\x0ctransactions\x18\x02 \x03(\x0b\x32\x14.payment.Transaction\x12\x0f\n\x07message\x18\x03 \x01(\t\"(\n\x12\x42\x61nkBalanceRequest\x12\x12\n\naccount_id\x18\x01 \x01(\t\"H\n\x13\x42\x61nkBalanceResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07\x62\x61lance\x18\x02 \x01(\x01\x12\x0f\n\x07message\x18\x03 \x01(\t\"D\n\x0b\x41uthRequest\x12\x10\n\x08username\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\x12\x11\n\tbank_name\x18\x03 \x01(\t\"?\n\x0c\x41uthResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\r\n\x05token\x18\x02 \x01(\t\x12\x0f\n\x07message\x18\x03 \x01(\t\"C\n\x1d\x43redentialVerificationRequest\x12\x10\n\x08username\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\"T\n\x1e\x43redentialVerificationResponse\x12\r\n\x05valid\x18\x01 \x01(\x08\x12\x12\n\naccount_id\x18\x02 \x01(\t\x12\x0f\n\x07message\x18\x03 \x01(\t\"3\n\x0e\x42\x61lanceRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x12\n\naccount_id\x18\x02 \x01(\t\"D\n\x0f\x42\x61lanceResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07\x62\x61lance\x18\x02 \x01(\x01\x12\x0f\n\x07message\x18\x03 \x01(\t\"\x8c\x01\n\x0ePaymentRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x16\n\x0esender_account\x18\x02 \x01(\t\x12\x18\n\x10receiver_account\x18\x03 \x01(\t\x12\x15\n\rreceiver_bank\x18\x04 \x01(\t\x12\x0e\n\x06\x61mount\x18\x05 \x01(\x01\x12\x12\n\npayment_id\x18\x06 \x01(\t\"[\n\x0fPaymentResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x16\n\x0etransaction_id\x18\x02 \x01(\t\x12\x0e\n\x06status\x18\x03 \x01(\t\x12\x0f\n\x07message\x18\x04 \x01(\t\"B\n\x0eHistoryRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x12\n\naccount_id\x18\x02 \x01(\t\x12\r\n\x05limit\x18\x03 \x01(\x05\"|\n\x0bTransaction\x12\x16\n\x0etransaction_id\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t\x12\x0e\n\x06\x61mount\x18\x03 \x01(\x01\x12\x14\n\x0c\x63ounterparty\x18\x04 \x01(\t\x12\x11\n\ttimestamp\x18\x05 \x01(\t\x12\x0e\n\x06status\x18\x06 \x01(\t\"_\n\x0fHistoryResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12*\n\x0ctransactions\x18\x02 \x03(\x0b\x32\x14.payment.Transaction\x12\x0f\n\x07message\x18\x03 \x01(\t2\xf5\x02\n\x0ePaymentGateway\x12=\n\x0c\x41uthenticate\x12\x14.payment.AuthRequest\x1a\x15.payment.AuthResponse\"\x00\x12\x43\n\x0c\x43heckBalance\x12\x17.payment.BalanceRequest\x1a\x18.payment.BalanceResponse\"\x00\x12\x45\n\x0eProcessPayment\x12\x17.payment.PaymentRequest\x1a\x18.payment.PaymentResponse\"\x00\x12J\n\x0fProcessPayments\x12\x17.payment.PaymentRequest\x1a\x18.payment.PaymentResponse\"\x00(\x01\x30\x01\x12L\n\x15GetTransactionHistory\x12\x17.payment.HistoryRequest\x1a\x18.payment.HistoryResponse\"\x00\x32\xdd\x05\n\x0b\x42\x61nkService\x12\x66\n\x11VerifyCredentials\x12&.payment.CredentialVerificationRequest\x1a\'.payment.CredentialVerificationResponse\"\x00\x12I\n\nGetBalance\x12\x1b.payment.BankBalanceRequest\x1a\x1c.payment.BankBalanceResponse\"\x00\x12Y\n\x12ProcessTransaction\x12\x1f.payment.BankTransactionRequest\x1a .payment.BankTransactionResponse\"\x00\x12N\n\x15GetTransactionHistory\x12\x1b.payment.BankHistoryRequest\x1a\x14.payment.Transaction\"\x00\x30\x01\x12V\n\x0f\x45xecuteTransfer\x12\x1f.payment.ExecuteTransferRequest\x1a .payment.ExecuteTransferResponse\"\x00\x12_\n\x12PrepareTransaction\x12\".payment.PrepareTransactionRequest\x1a#.payment.PrepareTransactionResponse\"\x00\x12\\\n\x11\x43ommitTransaction\x12!.payment.CommitTransactionRequest\x1a\".payment.CommitTransactionResponse\"\x00\x12Y\n\x10\x41\x62ortTransaction\x12 .payment.AbortTransactionRequest\x1a!.payment.AbortTransactionResponse\"\x00\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -33,52 +33,56 @@ if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
   _globals['_BANKTRANSACTIONREQUEST']._serialized_start=26
   _globals['_BANKTRANSACTIONREQUEST']._serialized_end=142
-  _globals['_PREPARETRANSACTIONREQUEST']._serialized_start=144
-  _globals['_PREPARETRANSACTIONREQUEST']._serialized_end=267
-  _globals['_PREPARETRANSACTIONRESPONSE']._serialized_start=269
-  _globals['_PREPARETRANSACTIONRESPONSE']._serialized_end=329
-  _globals['_COMMITTRANSACTIONREQUEST']._serialized_start=331
-  _globals['_COMMITTRANSACTIONREQUEST']._serialized_end=381
-  _globals['_COMMITTRANSACTIONRESPONSE']._serialized_start=383
-  _globals['_COMMITTRANSACTIONRESPONSE']._serialized_end=444
-  _globals['_ABORTTRANSACTIONREQUEST']._serialized_start=446
-  _globals['_ABORTTRANSACTIONREQUEST']._serialized_end=495
-  _globals['_ABORTTRANSACTIONRESPONSE']._serialized_start=497
-  _globals['_ABORTTRANSACTIONRESPONSE']._serialized_end=557
-  _globals['_BANKTRANSACTIONRESPONSE']._serialized_start=559
-  _globals['_BANKTRANSACTIONRESPONSE']._serialized_end=618
-  _globals['_BANKHISTORYREQUEST']._serialized_start=620
-  _globals['_BANKHISTORYREQUEST']._serialized_end=675
-  _globals['_BANKHISTORYRESPONSE']._serialized_start=677
-  _globals['_BANKHISTORYRESPONSE']._serialized_end=776
-  _globals['_BANKBALANCEREQUEST']._serialized_start=778
-  _globals['_BANKBALANCEREQUEST']._serialized_end=818
-  _globals['_BANKBALANCERESPONSE']._serialized_start=820
-  _globals['_BANKBALANCERESPONSE']._serialized_end=892
-  _globals['_AUTHREQUEST']._serialized_start=894
-  _globals['_AUTHREQUEST']._serialized_end=962
-  _globals['_AUTHRESPONSE']._serialized_start=964
-  _globals['_AUTHRESPONSE']._serialized_end=1027
-  _globals['_CREDENTIALVERIFICATIONREQUEST']._serialized_start=1029
-  _globals['_CREDENTIALVERIFICATIONREQUEST']._serialized_end=1096
-  _globals['_CREDENTIALVERIFICATIONRESPONSE']._serialized_start=1098
-  _globals['_CREDENTIALVERIFICATIONRESPONSE']._serialized_end=1182
-  _globals['_BALANCEREQUEST']._serialized_start=1184
-  _globals['_BALANCEREQUEST']._serialized_end=1235
-  _globals['_BALANCERESPONSE']._serialized_start=1237
-  _globals['_BALANCERESPONSE']._serialized_end=1305
-  _globals['_PAYMENTREQUEST']._serialized_start=1308
-  _globals['_PAYMENTREQUEST']._serialized_end=1448
-  _globals['_PAYMENTRESPONSE']._serialized_start=1450
-  _globals['_PAYMENTRESPONSE']._serialized_end=1541
-  _globals['_HISTORYREQUEST']._serialized_start=1543
-  _globals['_HISTORYREQUEST']._serialized_end=1609
-  _globals['_TRANSACTION']._serialized_start=1611
-  _globals['_TRANSACTION']._serialized_end=1735
-  _globals['_HISTORYRESPONSE']._serialized_start=1737
-  _globals['_HISTORYRESPONSE']._serialized_end=1832
-  _globals['_PAYMENTGATEWAY']._serialized_start=1835
-  _globals['_PAYMENTGATEWAY']._serialized_end=2132
-  _globals['_BANKSERVICE']._serialized_start=2135
-  _globals['_BANKSERVICE']._serialized_end=2786
+  _globals['_EXECUTETRANSFERREQUEST']._serialized_start=145
+  _globals['_EXECUTETRANSFERREQUEST']._serialized_end=279
+  _globals['_EXECUTETRANSFERRESPONSE']._serialized_start=281
+  _globals['_EXECUTETRANSFERRESPONSE']._serialized_end=340
+  _globals['_PREPARETRANSACTIONREQUEST']._serialized_start=342
+  _globals['_PREPARETRANSACTIONREQUEST']._serialized_end=465
+  _globals['_PREPARETRANSACTIONRESPONSE']._serialized_start=467
+  _globals['_PREPARETRANSACTIONRESPONSE']._serialized_end=527
+  _globals['_COMMITTRANSACTIONREQUEST']._serialized_start=529
+  _globals['_COMMITTRANSACTIONREQUEST']._serialized_end=579
+  _globals['_COMMITTRANSACTIONRESPONSE']._serialized_start=581
+  _globals['_COMMITTRANSACTIONRESPONSE']._serialized_end=642
+  _globals['_ABORTTRANSACTIONREQUEST']._serialized_start=644
+  _globals['_ABORTTRANSACTIONREQUEST']._serialized_end=693
+  _globals['_ABORTTRANSACTIONRESPONSE']._serialized_start=695
+  _globals['_ABORTTRANSACTIONRESPONSE']._serialized_end=755
+  _globals['_BANKTRANSACTIONRESPONSE']._serialized_start=757
+  _globals['_BANKTRANSACTIONRESPONSE']._serialized_end=816
+  _globals['_BANKHISTORYREQUEST']._serialized_start=818
+  _globals['_BANKHISTORYREQUEST']._serialized_end=873
+  _globals['_BANKHISTORYRESPONSE']._serialized_start=875
+  _globals['_BANKHISTORYRESPONSE']._serialized_end=974
+  _globals['_BANKBALANCEREQUEST']._serialized_start=976
+  _globals['_BANKBALANCEREQUEST']._serialized_end=1016
+  _globals['_BANKBALANCERESPONSE']._serialized_start=1018
+  _globals['_BANKBALANCERESPONSE']._serialized_end=1090
+  _globals['_AUTHREQUEST']._serialized_start=1092
+  _globals['_AUTHREQUEST']._serialized_end=1160
+  _globals['_AUTHRESPONSE']._serialized_start=1162
+  _globals['_AUTHRESPONSE']._serialized_end=1225
+  _globals['_CREDENTIALVERIFICATIONREQUEST']._serialized_start=1227
+  _globals['_CREDENTIALVERIFICATIONREQUEST']._serialized_end=1294
+  _globals['_CREDENTIALVERIFICATIONRESPONSE']._serialized_start=1296
+  _globals['_CREDENTIALVERIFICATIONRESPONSE']._serialized_end=1380
+  _globals['_BALANCEREQUEST']._serialized_start=1382
+  _globals['_BALANCEREQUEST']._serialized_end=1433
+  _globals['_BALANCERESPONSE']._serialized_start=1435
+  _globals['_BALANCERESPONSE']._serialized_end=1503
+  _globals['_PAYMENTREQUEST']._serialized_start=1506
+  _globals['_PAYMENTREQUEST']._serialized_end=1646
+  _globals['_PAYMENTRESPONSE']._serialized_start=1648
+  _globals['_PAYMENTRESPONSE']._serialized_end=1739
+  _globals['_HISTORYREQUEST']._serialized_start=1741
+  _globals['_HISTORYREQUEST']._serialized_end=1807
+  _globals['_TRANSACTION']._serialized_start=1809
+  _globals['_TRANSACTION']._serialized_end=1933
+  _globals['_HISTORYRESPONSE']._serialized_start=1935
+  _globals['_HISTORYRESPONSE']._serialized_end=2030
+  _globals['_PAYMENTGATEWAY']._serialized_start=2033
+  _globals['_PAYMENTGATEWAY']._serialized_end=2406
+  _globals['_BANKSERVICE']._serialized_start=2409
+  _globals['_BANKSERVICE']._serialized_end=3142
 # @@protoc_insertion_point(module_scope)
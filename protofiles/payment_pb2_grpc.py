@@ -5,7 +5,7 @@ import warnings
 
 import protofiles.payment_pb2 as payment__pb2
 
-GRPC_GENERATED_VERSION = '1.70.0'
+GRPC_GENERATED_VERSION = '1.83.0'
 GRPC_VERSION = grpc.__version__
 _version_not_supported = False
 
@@ -18,14 +18,14 @@ except ImportError:
 if _version_not_supported:
     raise RuntimeError(
         f'The grpc package installed is at version {GRPC_VERSION},'
-        + f' but the generated code in payment_pb2_grpc.py depends on'
+        + ' but the generated code in payment_pb2_grpc.py depends on'
         + f' grpcio>={GRPC_GENERATED_VERSION}.'
         + f' Please upgrade your grpc module to grpcio>={GRPC_GENERATED_VERSION}'
         + f' or downgrade your generated code using grpcio-tools<={GRPC_VERSION}.'
     )
 
 
-class PaymentGatewayStub(object):
+class PaymentGatewayStub:
     """Payment Gateway Service (for client-gateway communication)
     """
 
@@ -50,6 +50,11 @@ class PaymentGatewayStub(object):
                 request_serializer=payment__pb2.PaymentRequest.SerializeToString,
                 response_deserializer=payment__pb2.PaymentResponse.FromString,
                 _registered_method=True)
+        self.ProcessPayments = channel.stream_stream(
+                '/payment.PaymentGateway/ProcessPayments',
+                request_serializer=payment__pb2.PaymentRequest.SerializeToString,
+                response_deserializer=payment__pb2.PaymentResponse.FromString,
+                _registered_method=True)
         self.GetTransactionHistory = channel.unary_unary(
                 '/payment.PaymentGateway/GetTransactionHistory',
                 request_serializer=payment__pb2.HistoryRequest.SerializeToString,
@@ -57,7 +62,7 @@ class PaymentGatewayStub(object):
                 _registered_method=True)
 
 
-class PaymentGatewayServicer(object):
+class PaymentGatewayServicer:
     """Payment Gateway Service (for client-gateway communication)
     """
 
@@ -81,6 +86,14 @@ class PaymentGatewayServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def ProcessPayments(self, request_iterator, context):
+        """Batch path: streams queued payments over one call, one response per
+        request, amortizing headers and TLS framing across the batch
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def GetTransactionHistory(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -105,6 +118,11 @@ def add_PaymentGatewayServicer_to_server(servicer, server):
                     request_deserializer=payment__pb2.PaymentRequest.FromString,
                     response_serializer=payment__pb2.PaymentResponse.SerializeToString,
             ),
+            'ProcessPayments': grpc.stream_stream_rpc_method_handler(
+                    servicer.ProcessPayments,
+                    request_deserializer=payment__pb2.PaymentRequest.FromString,
+                    response_serializer=payment__pb2.PaymentResponse.SerializeToString,
+            ),
             'GetTransactionHistory': grpc.unary_unary_rpc_method_handler(
                     servicer.GetTransactionHistory,
                     request_deserializer=payment__pb2.HistoryRequest.FromString,
@@ -118,7 +136,7 @@ def add_PaymentGatewayServicer_to_server(servicer, server):
 
 
  # This class is part of an EXPERIMENTAL API.
-class PaymentGateway(object):
+class PaymentGateway:
     """Payment Gateway Service (for client-gateway communication)
     """
 
@@ -203,6 +221,33 @@ class PaymentGateway(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def ProcessPayments(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/payment.PaymentGateway/ProcessPayments',
+            payment__pb2.PaymentRequest.SerializeToString,
+            payment__pb2.PaymentResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def GetTransactionHistory(request,
             target,
@@ -231,7 +276,7 @@ class PaymentGateway(object):
             _registered_method=True)
 
 
-class BankServiceStub(object):
+class BankServiceStub:
     """Bank Service (for gateway-bank communication)
     """
 
@@ -256,10 +301,15 @@ class BankServiceStub(object):
                 request_serializer=payment__pb2.BankTransactionRequest.SerializeToString,
                 response_deserializer=payment__pb2.BankTransactionResponse.FromString,
                 _registered_method=True)
-        self.GetTransactionHistory = channel.unary_unary(
+        self.GetTransactionHistory = channel.unary_stream(
                 '/payment.BankService/GetTransactionHistory',
                 request_serializer=payment__pb2.BankHistoryRequest.SerializeToString,
-                response_deserializer=payment__pb2.BankHistoryResponse.FromString,
+                response_deserializer=payment__pb2.Transaction.FromString,
+                _registered_method=True)
+        self.ExecuteTransfer = channel.unary_unary(
+                '/payment.BankService/ExecuteTransfer',
+                request_serializer=payment__pb2.ExecuteTransferRequest.SerializeToString,
+                response_deserializer=payment__pb2.ExecuteTransferResponse.FromString,
                 _registered_method=True)
         self.PrepareTransaction = channel.unary_unary(
                 '/payment.BankService/PrepareTransaction',
@@ -278,7 +328,7 @@ class BankServiceStub(object):
                 _registered_method=True)
 
 
-class BankServiceServicer(object):
+class BankServiceServicer:
     """Bank Service (for gateway-bank communication)
     """
 
@@ -302,7 +352,18 @@ class BankServiceServicer(object):
         raise NotImplementedError('Method not implemented!')
 
     def GetTransactionHistory(self, request, context):
-        """Missing associated documentation comment in .proto file."""
+        """Server-streaming: transactions flow back one at a time instead of being
+        materialized into one bulk response
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ExecuteTransfer(self, request, context):
+        """One-phase fast path: when sender and receiver share a bank the whole
+        transfer is a single local transaction, so 2PC's four RPCs collapse
+        into this one call
+        """
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
@@ -343,10 +404,15 @@ def add_BankServiceServicer_to_server(servicer, server):
                     request_deserializer=payment__pb2.BankTransactionRequest.FromString,
                     response_serializer=payment__pb2.BankTransactionResponse.SerializeToString,
             ),
-            'GetTransactionHistory': grpc.unary_unary_rpc_method_handler(
+            'GetTransactionHistory': grpc.unary_stream_rpc_method_handler(
                     servicer.GetTransactionHistory,
                     request_deserializer=payment__pb2.BankHistoryRequest.FromString,
-                    response_serializer=payment__pb2.BankHistoryResponse.SerializeToString,
+                    response_serializer=payment__pb2.Transaction.SerializeToString,
+            ),
+            'ExecuteTransfer': grpc.unary_unary_rpc_method_handler(
+                    servicer.ExecuteTransfer,
+                    request_deserializer=payment__pb2.ExecuteTransferRequest.FromString,
+                    response_serializer=payment__pb2.ExecuteTransferResponse.SerializeToString,
             ),
             'PrepareTransaction': grpc.unary_unary_rpc_method_handler(
                     servicer.PrepareTransaction,
@@ -371,7 +437,7 @@ def add_BankServiceServicer_to_server(servicer, server):
 
 
  # This class is part of an EXPERIMENTAL API.
-class BankService(object):
+class BankService:
     """Bank Service (for gateway-bank communication)
     """
 
@@ -467,12 +533,39 @@ class BankService(object):
             wait_for_ready=None,
             timeout=None,
             metadata=None):
-        return grpc.experimental.unary_unary(
+        return grpc.experimental.unary_stream(
             request,
             target,
             '/payment.BankService/GetTransactionHistory',
             payment__pb2.BankHistoryRequest.SerializeToString,
-            payment__pb2.BankHistoryResponse.FromString,
+            payment__pb2.Transaction.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ExecuteTransfer(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/payment.BankService/ExecuteTransfer',
+            payment__pb2.ExecuteTransferRequest.SerializeToString,
+            payment__pb2.ExecuteTransferResponse.FromString,
             options,
             channel_credentials,
             insecure,